@@ -2,6 +2,7 @@ import pygame
 import random
 from enum import Enum # an enumeration is a set of symbolic names (members) bound to unique, constant values
 from collections import namedtuple # namedtuple is a tuple subclass that allows us to refer to each value in the tuple by a name
+from SnakeGameAI import FreeCells # free board cells for O(1) food placement
 
 pygame.init() # initialize all imported pygame modules
 # font = pygame.font.Font('ChrustyRock-ORLA.ttf', 25)   # issue with this font for numbers 3-9
@@ -41,17 +42,24 @@ class SnakeGame:
 
         self.head = Point(self.w/2, self.h/2) # head of the snake
         self.snake = [self.head, Point(self.head.x - BLOCK_SIZE, self.head.y), Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)] # snake body
+        self.free = FreeCells((self.w // BLOCK_SIZE) * (self.h // BLOCK_SIZE)) # cells with no body part, where food can go
+        for pt in self.snake:
+            self.free.remove(self._cell(pt))
 
         self.score = 0 # score
         self.food = None # food
         self._place_food() # place food
 
-    def _place_food(self): # place food
-        x = random.randint(0, (self.w - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE # random x coordinate
-        y = random.randint(0, (self.h - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE # random y coordinate
-        self.food = Point(x, y) # food point
-        if self.food in self.snake: # if food is in snake
-            self._place_food() ## place food again
+    def _place_food(self): # place food on a uniformly random free cell | returns False when the snake fills the board
+        if not self.free: # board full, the game is won
+            return False
+        cell = self.free.choice(random) # one draw, no retries
+        cols = self.w // BLOCK_SIZE
+        self.food = Point(cell % cols * BLOCK_SIZE, cell // cols * BLOCK_SIZE) # food point
+        return True
+
+    def _cell(self, pt): # flat index of the cell under point pt
+        return int(pt.y) // BLOCK_SIZE * (self.w // BLOCK_SIZE) + int(pt.x) // BLOCK_SIZE
 
     def play_step(self): # play step
         # 1. collect user input
@@ -78,13 +86,17 @@ class SnakeGame:
         if self._is_collision(): # if collision
             game_over = True
             return game_over, self.score
+        self.free.remove(self._cell(self.head)) # the head is on the board and not on the body
 
         # 4. place new food or just move
         if self.head == self.food: # if head is at food
             self.score += 1
-            self._place_food() # place food
+            if not self._place_food(): # place food | no free cell left: the snake fills the board
+                game_over = True # won
+                return game_over, self.score
         else:
-            self.snake.pop() # remove the last element of the snake
+            tail = self.snake.pop() # remove the last element of the snake
+            self.free.add(self._cell(tail))
 
         # 5. update ui and clock
         self.update_ui()
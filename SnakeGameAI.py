@@ -1,12 +1,10 @@
-import pygame
 import random
 from enum import Enum # enum is a class that represents data that is limited to a fixed set of values
 from collections import namedtuple # namedtuple is a tuple subclass that allows us to refer to each value in the tuple by a name
+from collections import deque # deque is a list-like container with fast appends and pops on either end
 import numpy as np # numpy is a library for scientific computing
 
-pygame.init() # initialize all imported pygame modules
-# font = pygame.font.Font('ChrustyRock-ORLA.ttf', 25)   # issue with this font for numbers 3-9
-font = pygame.font.Font('arial_bold.ttf', 25) # font
+# pygame is only imported by renderer.py so the game can run headless (no display, no frame-rate cap)
 
 class Direction(Enum):
     RIGHT = 1
@@ -17,59 +15,83 @@ class Direction(Enum):
 Point = namedtuple('Point', 'x, y') # namedtuple is a tuple subclass that allows us to refer to each value in the tuple by a name
 
 BLOCK_SIZE = 20 # size of each block
-SPEED = 50 # speed of the game
-
-# RGB colors
-WHITE = (255, 255, 255)
-RED1 = (255, 0, 0)
-RED2 = (200, 0, 0)
-BLUE1 = (0, 0, 255)
-BLUE2 = (0, 100, 255)
-BLACK = (0, 0, 0)
-GREEN1 = (0, 255, 0)
-GREEN2 = (0, 200, 0)
-GREY = (128, 128, 128)
+
+class FreeCells: # set of empty board cells with O(1) add, remove and uniform random choice
+    def __init__(self, n_cells): # starts with every cell 0 .. n_cells - 1 free
+        self.cells = list(range(n_cells)) # free cells in no particular order
+        self.pos = list(range(n_cells)) # cell -> its index in self.cells, -1 if taken
+
+    def __len__(self):
+        return len(self.cells)
+
+    def remove(self, cell): # cell becomes taken | swap the last free cell into its slot
+        i = self.pos[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.pos[last] = i
+        self.pos[cell] = -1
+
+    def add(self, cell): # cell becomes free again
+        self.pos[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self, rng): # uniform random free cell | the caller checks that one is left
+        return self.cells[rng.randrange(len(self.cells))]
 
 class SnakeGameAI:
-    def __init__(self, w = 640, h = 480): # w = width, h = height
+    def __init__(self, w = 640, h = 480, render = False, seed = None): # w = width, h = height, render = open a pygame window to watch the game, seed = makes every game reproducible (None = from the OS)
         self.w = w # width
         self.h = h # height
-        # init display
-        self.display = pygame.display.set_mode((self.w, self.h)) # set display
-        pygame.display.set_caption('Snake Game') # set caption
-        self.clock = pygame.time.Clock() # create an object to help track time
+        self.cols = w // BLOCK_SIZE # board width in cells
+        self.rows = h // BLOCK_SIZE # board height in cells
+        self.renderer = None # headless by default
+        if render:
+            from renderer import Renderer # only import pygame when a window is wanted
+            self.renderer = Renderer(self.w, self.h) # opens the display
+        self.seed_rng = random.Random(seed) # draws one seed per game
         self.reset() # reset game state
 
-    def reset(self):
+    def reset(self, seed = None): # seed = replay a specific game (see episode_trace.py), otherwise the next seed is drawn
         # init game state
+        self.episode_seed = self.seed_rng.getrandbits(63) if seed is None else seed # this seed plus the moves rebuild the whole game
+        self.rng = random.Random(self.episode_seed) # per-game random generator for food placement
         self.direction = Direction.RIGHT
 
         self.head = Point(self.w/2, self.h/2) # head of the snake
-        self.snake = [self.head, Point(self.head.x - BLOCK_SIZE, self.head.y), Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)] # snake body
+        self.snake = deque([self.head, Point(self.head.x - BLOCK_SIZE, self.head.y), Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)]) # snake body | head at index 0
+        self.occupied = bytearray(self.cols * self.rows) # occupancy grid | number of body parts on each cell (2 only when the head runs into the body)
+        self.free = FreeCells(self.cols * self.rows) # cells with no body part, where food can go
+        for pt in self.snake:
+            self.occupied[self._cell(pt)] += 1
+            self.free.remove(self._cell(pt))
 
         self.score = 0 # score
         self.food = None # food
         self._place_food() # place food
         self.frame_iteration = 0 # frame iteration
 
-    def _place_food(self): # place food
-        x = random.randint(0, (self.w - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE # random x coordinate
-        y = random.randint(0, (self.h - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE # random y coordinate
-        self.food = Point(x, y) # food point
-        if self.food in self.snake: # if food is in snake
-            self._place_food() #    place food again
+    def _place_food(self): # place food on a uniformly random free cell | returns False when the snake fills the board (food stays under the head)
+        if not self.free: # board full, the game is won
+            return False
+        cell = self.free.choice(self.rng) # one draw, no retries
+        self.food = Point(cell % self.cols * BLOCK_SIZE, cell // self.cols * BLOCK_SIZE) # food point
+        return True
 
     def play_step(self, action): # play step
         self.frame_iteration += 1 # frame iteration
         # 1. collect user input
-        for event in pygame.event.get(): # for each event
-            if event.type == pygame.QUIT: # if event is quit
-                pygame.quit()
-                quit()
+        if self.renderer is not None: # headless games have no window events
+            self.renderer.handle_events() # quit if the window is closed
 
         # 2. move
         self._move(action) # update the head
-        self.snake.insert(0, self.head) # insert the head to the snake
+        self.snake.appendleft(self.head) # insert the head to the snake
+        if 0 <= self.head.x < self.w and 0 <= self.head.y < self.h: # off-board heads end the game and are never looked up
+            cell = self._cell(self.head)
+            if not self.occupied[cell]:
+                self.free.remove(cell)
+            self.occupied[cell] += 1
 
         # 3. check if game over
         reward = 0 # reward
@@ -83,13 +105,19 @@ class SnakeGameAI:
         if self.head == self.food: # if head is at food
             self.score += 1 # score
             reward = 10 # reward
-            self._place_food() # place food
+            if not self._place_food(): # place food | no free cell left: the snake fills the board
+                game_over = True # won
+                return reward, game_over, self.score
         else:
-            self.snake.pop() # remove the last element of the snake
+            tail = self.snake.pop() # remove the last element of the snake
+            cell = self._cell(tail)
+            self.occupied[cell] -= 1
+            if not self.occupied[cell]:
+                self.free.add(cell)
 
         # 5. update ui and clock
-        self.update_ui() # update ui
-        self.clock.tick(SPEED) # tick the clock
+        if self.renderer is not None: # only draw and cap the frame rate when rendering
+            self.renderer.draw(self) # update ui and tick the clock
 
         # 6. return game over and score
         return reward, game_over, self.score
@@ -100,25 +128,14 @@ class SnakeGameAI:
         # hits boundary
         if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0: # if point is out of bounds
             return True
-        # hits itself
-        if pt in self.snake[1:]: # if point is in snake
-            return True
-
-        return False
-
-    def update_ui(self):
-        self.display.fill(BLACK) # fill display with black
-
-        for pt in self.snake:
-            pygame.draw.rect(self.display, GREEN1, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)) # draw a rectangle for Green1
-            pygame.draw.rect(self.display, GREEN2, pygame.Rect(pt.x + 4, pt.y + 4, 12, 12)) # draw a rectangle for Green2
-
-        pygame.draw.rect(self.display, RED1, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE)) # draw a rectangle for Red1
-        pygame.draw.rect(self.display, RED2, pygame.Rect(self.food.x + 4, self.food.y + 4, 12, 12)) # draw a rectangle for food for Red2
-
-        text = font.render('Score: ' + str(self.score), True, WHITE) # render text
-        self.display.blit(text, [0, 0]) # blit draws one image onto another | blit(source, dest, area = None, special_flags = 0) -> Rect
-        pygame.display.flip()
+        # hits itself | same as pt in self.snake[1:] without copying and scanning the body
+        count = self.occupied[self._cell(pt)] # body parts on this cell
+        if pt == self.snake[0]: # the head itself does not count
+            count -= 1
+        return count > 0
+
+    def _cell(self, pt): # flat index of the cell under point pt
+        return int(pt.y) // BLOCK_SIZE * self.cols + int(pt.x) // BLOCK_SIZE
 
     def _move(self, action): # move
         # [straight, right, left]
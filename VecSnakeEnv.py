@@ -0,0 +1,110 @@
+import numpy as np # numpy is a library for scientific computing
+from SnakeGameAI import BLOCK_SIZE # size of each block
+
+# N copies of the SnakeGameAI rules stepped at once with numpy arrays instead of Python objects
+# directions are indexes into the clockwise order [RIGHT, DOWN, LEFT, UP] used by SnakeGameAI._move
+DX = np.array([1, 0, -1, 0], dtype = np.int32) # x step for each direction
+DY = np.array([0, 1, 0, -1], dtype = np.int32) # y step for each direction
+TURN = np.array([0, 1, -1], dtype = np.int32) # [straight, right, left] -> change in clockwise index
+
+class VecSnakeEnv:
+    def __init__(self, n_envs, w = 640, h = 480, seed = None): # n_envs = number of games, w = width, h = height (pixels like SnakeGameAI)
+        self.n = n_envs # number of games
+        self.cols = w // BLOCK_SIZE # board width in cells
+        self.rows = h // BLOCK_SIZE # board height in cells
+        self.n_cells = self.cols * self.rows # cells on the board = longest possible snake
+        self.rng = np.random.default_rng(seed) # random generator for food placement
+
+        # preallocated game state | cells are stored as flat indexes y * cols + x
+        self.occupied = np.zeros((self.n, self.n_cells), dtype = bool) # occupancy grid of the snake bodies
+        self.body = np.zeros((self.n, self.n_cells), dtype = np.int32) # ring buffer of body cells, tail at self.tail, head at tail + length - 1
+        self.tail = np.zeros(self.n, dtype = np.int32) # ring buffer index of the tail
+        self.length = np.zeros(self.n, dtype = np.int32) # snake length
+        self.head_x = np.zeros(self.n, dtype = np.int32) # head x in cells
+        self.head_y = np.zeros(self.n, dtype = np.int32) # head y in cells
+        self.direction = np.zeros(self.n, dtype = np.int32) # clockwise direction index
+        self.food = np.zeros(self.n, dtype = np.int32) # food cell
+        self.score = np.zeros(self.n, dtype = np.int32) # score
+        self.frame_iteration = np.zeros(self.n, dtype = np.int32) # frames since reset
+
+        self._arange = np.arange(self.n) # row indexes for fancy indexing
+        self.reset()
+
+    def reset(self, mask = None): # reset all games, or only the games where mask is True
+        idx = self._arange if mask is None else np.flatnonzero(mask) # games to reset
+        if len(idx) == 0:
+            return
+
+        hx, hy = self.cols // 2, self.rows // 2 # same start as SnakeGameAI: head in the middle, two blocks trailing left
+        self.occupied[idx] = False
+        self.body[idx, 0] = hy * self.cols + hx - 2 # tail
+        self.body[idx, 1] = hy * self.cols + hx - 1
+        self.body[idx, 2] = hy * self.cols + hx # head
+        self.occupied[idx[:, None], self.body[idx, :3]] = True
+        self.tail[idx] = 0
+        self.length[idx] = 3
+        self.head_x[idx] = hx
+        self.head_y[idx] = hy
+        self.direction[idx] = 0 # RIGHT
+        self.score[idx] = 0
+        self.frame_iteration[idx] = 0
+        self._place_food(idx)
+
+    def _place_food(self, idx): # place food for the games in idx on a uniformly random free cell | returns the games in idx with no free cell left (the snake fills the board)
+        if len(idx) == 0:
+            return idx
+        occupied = self.occupied[idx]
+        keys = self.rng.random((len(idx), self.n_cells)) # random key for every cell, one draw per game and no retries
+        keys[occupied] = -1 # the snake's cells never win the argmax
+        self.food[idx] = keys.argmax(axis = 1) # the free cell with the largest key, uniform over the free cells
+        return idx[occupied.all(axis = 1)]
+
+    def step(self, actions): # actions = (N, 3) one-hot [straight, right, left] | returns (N,) rewards, dones, scores
+        actions = np.asarray(actions)
+        self.frame_iteration += 1 # frame iteration
+
+        # 1. move
+        self.direction = (self.direction + TURN[actions.argmax(axis = 1)]) % 4 # turn
+        x = self.head_x + DX[self.direction] # new head x
+        y = self.head_y + DY[self.direction] # new head y
+
+        # 2. check if game over | the tail has not moved yet, same as SnakeGameAI.is_collision after insert
+        out = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows) # hits boundary
+        cell = np.clip(y, 0, self.rows - 1) * self.cols + np.clip(x, 0, self.cols - 1) # new head cell (clipped so out of bounds games index safely)
+        hit = self.occupied[self._arange, cell] & ~out # hits itself
+        timeout = self.frame_iteration > 100 * (self.length + 1) # same as frame_iteration > 100 * len(snake) with the new head inserted
+        dones = out | hit | timeout
+
+        rewards = np.zeros(self.n, dtype = np.float32) # reward
+        rewards[dones] = -10
+        scores = self.score.copy() # score at the end of this step (final score for finished games)
+
+        # 3. insert the new head for the games still running
+        alive = np.flatnonzero(~dones)
+        a_cell = cell[alive]
+        self.body[alive, (self.tail[alive] + self.length[alive]) % self.n_cells] = a_cell
+        self.occupied[alive, a_cell] = True
+        self.length[alive] += 1
+        self.head_x[alive] = x[alive]
+        self.head_y[alive] = y[alive]
+
+        # 4. place new food or just move
+        eat = a_cell == self.food[alive]
+        eaters = alive[eat]
+        self.score[eaters] += 1
+        scores[eaters] += 1
+        rewards[eaters] = 10
+        movers = alive[~eat]
+        self.occupied[movers, self.body[movers, self.tail[movers]]] = False # remove the last element of the snake
+        self.tail[movers] = (self.tail[movers] + 1) % self.n_cells
+        self.length[movers] -= 1
+        won = self._place_food(eaters) # no free cell left: the snake fills the board
+        dones[won] = True # game over, keeps the reward of 10 like SnakeGameAI
+
+        # 5. start a new game wherever the last one ended
+        self.reset(dones)
+
+        return rewards, dones, scores
+
+    def heads(self): # (N,) flat head cells
+        return self.body[self._arange, (self.tail + self.length - 1) % self.n_cells]
@@ -1,145 +1,300 @@
 import torch
 import random
+import argparse # command line options
 import numpy as np
-from collections import deque # deque is a list-like container with fast appends and pops on either end
-from SnakeGameAI import SnakeGameAI, Direction, Point, BLOCK_SIZE # SnakeGameAI is a class, Direction is an enum, Point is a namedtuple, BLOCK_SIZE is a constant
-from model import Linear_QNet, QTrainer # Linear_QNet is a class, QTrainer is a class
-from helper import plot # plot is a function
+from SnakeGameAI import SnakeGameAI, BLOCK_SIZE # SnakeGameAI is a class
+from model import Linear_QNet, Ray_QNet, Conv_QNet, QTrainer, LOSSES # Q networks for each observation, QTrainer is a class
+from replay import ReplayBuffer, PrioritizedReplayBuffer, ReplayStore # preallocated replay memory, on-disk transition store
+from state import OBSERVATIONS, GRID_CHANNELS, make_encoder # state encoders
+from metrics import MetricsLogger # background writer for per-game metrics
+import checkpoint # crash-safe trainer checkpoints
+from episode_trace import TraceRecorder # replayable game traces
+from profiler import NullProfiler, Profiler, PrintSink, FileSink, PrometheusSink # opt-in hot path instrumentation
 
 MAX_MEMORY = 100_000 # number of samples to store in memory
 BATCH_SIZE = 1000 # number of samples to train on
 LR = 0.001 # learning rate
+GAMMA = 0.9 # discount rate | 0.9 is good for games like snake | must be smaller than 1
+HIDDEN_SIZE = 256 # hidden nodes in Linear_QNet
+UPDATE_BATCH = 64 # replay samples per update when training every update_every steps
+
+def model_file(observation): # file under ./model for the record model of an observation | the 11-feature model keeps model.pth, which export.py reads
+    return 'model.pth' if observation == 'features' else 'model_%s.pth' % observation
 
 class Agent:
-    def __init__(self):
+    def __init__(self, prioritized = False, lr = LR, gamma = GAMMA, hidden_size = HIDDEN_SIZE, max_memory = MAX_MEMORY, batch_size = BATCH_SIZE, seed = None, observation = 'features', w = 640, h = 480,
+                 update_every = 0, update_batch = UPDATE_BATCH, target_update = 0, tau = None, double = False, loss = 'mse', max_grad_norm = None): # prioritized = sample long memory by TD error instead of uniformly, seed = exploration and replay sampling seed
+        # update_every = instead of a batch-of-one update every step, one update on update_batch replay samples every update_every steps (0 = every step, the original short memory)
+        # target_update, tau, double, loss, max_grad_norm = target network and update options, see QTrainer
+        # observation = 'features' (the 11 features), 'grid' (full board planes, conv network) or 'rays' (8 ray-cast distances), w, h = board size of the games it plays | the rest default to the module constants
         self.n_games = 0 # number of games
+        self.rng = random.Random(seed) # random generator for exploration
         self.epsilon = 0 # randomness
-        self.gamma = 0.9 # discount rate | 0.9 is good for games like snake | must be smaller than 1
-        self.memory = deque(maxlen = MAX_MEMORY) # popleft() if maxlen is exceeded
-        self.model = Linear_QNet(11, 256, 3) # input size, hidden size, output size | 11 states, 256 hidden nodes, 3 actions | hidden size can change but input size and output size cannot due to the snake game and how it is set up
-        self.trainer = QTrainer(self.model, lr = LR, gamma = self.gamma) # model, learning rate, discount rate
+        self.gamma = gamma # discount rate
+        self.batch_size = batch_size # number of samples to train on
+        self.prioritized = prioritized
+        self.observation = observation
+        cols, rows = w // BLOCK_SIZE, h // BLOCK_SIZE # board size in cells
+        self.encoder = make_encoder(observation, cols, rows) # builds states into preallocated buffers
+        shape = self.encoder.shape # one state
+        packed = observation == 'grid' # binary board planes are stored bit-packed, 768 bytes per transition instead of 6 KB
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(max_memory, shape, 3, seed = seed, packed = packed) # sum-tree sampling by TD error
+        else:
+            self.memory = ReplayBuffer(max_memory, shape, 3, seed = seed, packed = packed) # oldest transitions are overwritten once max_memory is reached
+        if observation == 'grid':
+            self.model = Conv_QNet(GRID_CHANNELS, rows, cols, hidden_size, 3) # board planes -> 3 actions
+        elif observation == 'rays':
+            self.model = Ray_QNet(shape[0], hidden_size, 3, self.encoder.scale) # ray distances scaled to 0..1 -> 3 actions
+        else:
+            self.model = Linear_QNet(11, hidden_size, 3) # input size, hidden size, output size | 11 states, 256 hidden nodes by default, 3 actions | hidden size can change but input size and output size cannot due to the snake game and how it is set up
+        self.trainer = QTrainer(self.model, lr = lr, gamma = self.gamma, target_update = target_update, tau = tau, double = double, loss = loss, max_grad_norm = max_grad_norm) # model, learning rate, discount rate, target network options
+        self.update_every = update_every
+        self.update_batch = update_batch
+        self.steps = 0 # environment steps, drives update_every
 
-    # all states stored here | 11 states total which is important for the neural network first layer
+    # all states stored here | 11 states total which is important for the neural network first layer (or board planes / rays, see observation)
     def get_state(self, game):
-        head = game.snake[0] # head of snake
-        point_l = Point(head.x - BLOCK_SIZE, head.y) # point left
-        point_r = Point(head.x + BLOCK_SIZE, head.y) # point right
-        point_u = Point(head.x, head.y - BLOCK_SIZE) # point up
-        point_d = Point(head.x, head.y + BLOCK_SIZE) # point down
-
-        dir_l = game.direction == Direction.LEFT # direction is left
-        dir_r = game.direction == Direction.RIGHT # direction is right
-        dir_u = game.direction == Direction.UP # direction is up
-        dir_d = game.direction == Direction.DOWN # direction is down
-
-        state = [
-            # Danger straight
-            (dir_r and game.is_collision(point_r)) or # if direction is right and collision is true
-            (dir_l and game.is_collision(point_l)) or # if direction is left and collision is true
-            (dir_u and game.is_collision(point_u)) or # if direction is up and collision is true
-            (dir_d and game.is_collision(point_d)), # if direction is down and collision is true
-
-            # Danger right
-            (dir_u and game.is_collision(point_r)) or # if direction is up and collision is true
-            (dir_d and game.is_collision(point_l)) or # if direction is down and collision is true
-            (dir_l and game.is_collision(point_u)) or # if direction is left and collision is true
-            (dir_r and game.is_collision(point_d)), # if direction is right and collision is true
-
-            # Danger left
-            (dir_d and game.is_collision(point_r)) or # if direction is down and collision is true
-            (dir_u and game.is_collision(point_l)) or # if direction is up and collision is true
-            (dir_r and game.is_collision(point_u)) or # if direction is right and collision is true
-            (dir_l and game.is_collision(point_d)), # if direction is left and collision is true
-
-            # Move direction
-            dir_l, 
-            dir_r,
-            dir_u,
-            dir_d,
-
-            # Food location
-            game.food.x < game.head.x, # food left
-            game.food.x > game.head.x, # food right
-            game.food.y < game.head.y, # food up
-            game.food.y > game.head.y # food down
-        ]
-
-        return np.array(state, dtype = int) # convert to numpy array and int so True -> 1, False -> 0
+        return self.encoder.encode_games([game])[0].copy() # uint8 array [danger straight/right/left, direction l/r/u/d, food l/r/u/d] | copied because the encoder reuses its buffer
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done)) # popleft() if MAX_MEMORY is reached
+        self.memory.push(state, action, reward, next_state, done) # overwrites the oldest if max_memory is reached
 
     def train_long_memory(self): # train neural network with batches
-        if len(self.memory) > BATCH_SIZE: # if memory is greater than batch size
-            mini_sample = random.sample(self.memory, BATCH_SIZE) # list of tuples
+        self.train_replay(self.batch_size)
+
+    def train_replay(self, batch_size): # one train step on batch_size samples from memory
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, idx, weights = self.memory.sample(batch_size) # batch drawn in proportion to priority
+            td_errors = self.trainer.train_step(states, actions, rewards, next_states, dones, weights) # train step
+            self.memory.update_priorities(idx, td_errors) # replay surprising transitions more often
         else:
-            mini_sample = self.memory # list of tuples
-        
-        states, actions, rewards, next_states, dones = zip(*mini_sample) # returns a zip object, which is an iterator of tuples where the first item in each passed iterator is paired together, and then the second item in each passed iterator are paired together etc.
-        self.trainer.train_step(states, actions, rewards, next_states, dones) # train step
-        # other way of doing above
-        # for state, action, reward, next_state, done in mini_sample:
-        #     self.trainer.train_step(state, action, reward, next_state, done)
+            states, actions, rewards, next_states, dones = self.memory.sample(batch_size) # random batch of batch_size tensors, or the whole memory if it is smaller
+            self.trainer.train_step(states, actions, rewards, next_states, dones) # train step
 
-    def train_short_memory(self, state, action, reward, next_state, done): # train neural network with single sample
-        self.trainer.train_step(state, action, reward, next_state, done) # train step
+    def train_short_memory(self, state, action, reward, next_state, done): # train neural network with single sample | with update_every, a replay batch every update_every steps instead
+        if not self.update_every:
+            self.trainer.train_step(state, action, reward, next_state, done) # train step
+            return
+        self.steps += 1
+        if self.steps % self.update_every == 0: # the transition is already in memory, see train()
+            self.train_replay(self.update_batch)
 
     def get_action(self, state): # get action from model using epsilon-greedy algorithm
         # random moves: tradeoff exploration / exploitation
         self.epsilon = 80 - self.n_games # epsilon decays as n_games increases
         final_move = [0, 0, 0] # [straight, right, left]
-        if random.randint(0, 200) < self.epsilon: # if random number is less than epsilon
-            move = random.randint(0, 2) # move is random number between 0 and 2
+        if self.rng.randint(0, 200) < self.epsilon: # if random number is less than epsilon
+            move = self.rng.randint(0, 2) # move is random number between 0 and 2
             final_move[move] = 1 # set index to 1
         else: # get action from Q-network
-            state0 = torch.tensor(state, dtype = torch.float) # convert to tensor
-            prediction = self.model(state0) # get prediction from model
+            state0 = self.encoder.to_tensor(state) # float tensor sharing memory with a preallocated numpy buffer
+            with torch.no_grad(): # no autograd graph for acting
+                prediction = self.model(state0) # get prediction from model
             move = torch.argmax(prediction).item() # get index of greatest value | e.g. [5.0, 2.7, 0.1] -> max -> [1,0,0] | .item() gets the value of the tensor (converts to one number)
             final_move[move] = 1 # set index to 1
 
         return final_move
 
-def train():
-    plot_scores = [] # list of scores
-    plot_mean_scores = [] # list of mean scores
-    total_score = 0 # total score
+def train(render = False, prioritized = False, max_games = None, metrics_path = 'metrics.jsonl', checkpoint_path = './model/checkpoint.pth', checkpoint_interval = 50, checkpoint_memory = True, resume = False, record_path = None, seed = None, trace_path = None, profiler = None, **agent_options):
+    # render = watch the games in a pygame window (slower, needs a display), prioritized = prioritized replay, max_games = stop after this many games (None = forever)
+    # metrics_path = per-game log for helper.py, checkpoint_path = periodic checkpoint (None = off), checkpoint_interval = games between checkpoints
+    # checkpoint_memory = include the replay memory in checkpoints, resume = continue from checkpoint_path, record_path = also append every game to this ReplayStore file
+    # seed = make the run reproducible (torch init, exploration, food), trace_path = append a replayable trace of every game (see episode_trace.py)
+    # profiler = profiler.Profiler timing the hot path (None = off, no measurable cost)
+    # agent_options = hyperparameters for Agent (lr, gamma, hidden_size, max_memory, batch_size, observation, update_every, update_batch, target_update, tau, double, loss, max_grad_norm)
+    if seed is not None:
+        torch.manual_seed(seed) # model initialisation and anything else torch draws
+    prof = profiler if profiler is not None else NullProfiler()
+    metrics = MetricsLogger(metrics_path) # written off the training loop | watch with: python helper.py metrics.jsonl
     record = 0 # record score
-    agent = Agent() # agent
-    game = SnakeGameAI() # game
-    while True: 
-        # get old state
-        state_old = agent.get_state(game)
-
-        # get move
-        final_move = agent.get_action(state_old)
-
-        # perform move and get new state
-        reward, done, score = game.play_step(final_move)
-        state_new = agent.get_state(game)
-
-        # train short memory
-        agent.train_short_memory(state_old, final_move, reward, state_new, done)
-
-        # remember
-        agent.remember(state_old, final_move, reward, state_new, done)
-
-        if done:
-            # train long memory, plot result
-            game.reset()
-            agent.n_games += 1 # increment number of games
-            agent.train_long_memory()  # train long memory
-
-            if score > record: # if score is greater than record
-                record = score # record is score
-                agent.model.save() # save model
-            print('Game:', agent.n_games, 'Score:', score, 'Record:', record) # print game, score, and record
-
-            # plot
-            plot_scores.append(score) # append score to list of scores
-            total_score += score # add score to total score
-            mean_score = total_score / agent.n_games # mean score
-            plot_mean_scores.append(mean_score) # append mean score to list of mean scores
-            plot(plot_scores, plot_mean_scores) # plot scores and mean scores
+    agent = Agent(prioritized = prioritized, seed = seed, **agent_options) # agent
+    game = SnakeGameAI(render = render, seed = seed) # game | headless unless render is True
+    counters = {}
+    if resume: # pick up model, optimizer, replay memory, counters and RNG states
+        counters = checkpoint.restore(agent, checkpoint.load(checkpoint_path), game) # game picks up its seed stream where it stopped
+        record = counters['record']
+        metrics.load_state_dict(counters['metrics']) # also drops the rows logged after the checkpoint
+        print('Resumed from', checkpoint_path, 'at game', agent.n_games)
+    store = None
+    episode = [] # transitions of the current game, appended to the store when it ends
+    if record_path is not None:
+        if agent.observation != 'features':
+            raise ValueError('record_path stores the 11 bit-packed features, it cannot record %r observations' % agent.observation)
+        store = ReplayStore(record_path) # keeps every transition on disk for offline training
+        if counters.get('store_size') is not None:
+            store.truncate(counters['store_size']) # the games after the checkpoint are played again
+    tracer = None
+    if trace_path is not None:
+        tracer = TraceRecorder(trace_path) # seed + moves of every game
+        if counters.get('trace_offset') is not None:
+            tracer.truncate(counters['trace_offset'])
+        tracer.start(game)
+
+    def outputs(): # where the append-only files stand, so a resumed run can cut off what came after the checkpoint
+        return {
+            'metrics': metrics.state_dict(),
+            'store_size': None if store is None else len(store),
+            'trace_offset': None if tracer is None else tracer.offset(),
+        }
+    checkpointer = None
+    if checkpoint_path is not None:
+        checkpointer = checkpoint.Checkpointer(checkpoint_path, checkpoint_interval, checkpoint_memory) # written in the background
+    save_last = True # final checkpoint on a normal exit or Ctrl+C, not after a crash
+    try:
+        while max_games is None or agent.n_games < max_games:
+            # get old state
+            with prof.phase('get_state'):
+                state_old = agent.get_state(game)
+
+            # get move
+            with prof.phase('get_action'):
+                final_move = agent.get_action(state_old)
+
+            # perform move and get new state
+            with prof.phase('play_step'):
+                reward, done, score = game.play_step(final_move)
+            if tracer is not None:
+                tracer.add(final_move)
+            with prof.phase('get_state'):
+                state_new = agent.get_state(game)
+
+            # remember
+            with prof.phase('remember'):
+                agent.remember(state_old, final_move, reward, state_new, done)
+
+            # train short memory
+            with prof.phase('train_step'):
+                agent.train_short_memory(state_old, final_move, reward, state_new, done)
+            prof.step() # drives the periodic summaries and signal-triggered profiles
+            if store is not None:
+                episode.append((state_old, final_move, reward, state_new, done))
+
+            if done:
+                # train long memory, log result
+                if tracer is not None:
+                    tracer.finish(score) # appends the finished game to the trace file
+                game.reset()
+                if tracer is not None:
+                    tracer.start(game)
+                agent.n_games += 1 # increment number of games
+                with prof.phase('train_long_memory'):
+                    agent.train_long_memory()  # train long memory
+                prof.game()
+                prof.gauge('replay_size', len(agent.memory))
+                prof.gauge('loss', agent.trainer.last_loss) # long memory batch loss
+                if store is not None:
+                    store.append(*zip(*episode)) # whole game in one write
+                    episode = []
+
+                if score > record: # if score is greater than record
+                    record = score # record is score
+                    agent.model.save(model_file(agent.observation)) # save model | grid and rays models never overwrite the 11-feature model.pth
+                print('Game:', agent.n_games, 'Score:', score, 'Record:', record) # print game, score, and record
+
+                metrics.log(score, record) # queued for the background writer
+                if checkpointer is not None:
+                    checkpointer.maybe_save(agent, game, record = record, **outputs()) # every checkpoint_interval games
+    except Exception:
+        save_last = False # keep the last periodic checkpoint instead of the state that crashed
+        raise
+    finally:
+        prof.close() # last summary
+        metrics.close() # write what is still queued
+        if checkpointer is not None: # before closing the store and trace, outputs() reads where they stand
+            if save_last:
+                checkpointer.save(agent, game, record = record, **outputs()) # last state, also on Ctrl+C
+            checkpointer.close() # wait for it to reach the disk
+        if store is not None:
+            store.close()
+        if tracer is not None:
+            tracer.close()
+
+    return record
+
+def train_offline(store_path, steps = 10_000, batch_size = BATCH_SIZE, log_every = 1000, seed = None): # train a fresh model from a ReplayStore file without playing | seed = reproducible model init and sampling
+    if seed is not None:
+        torch.manual_seed(seed) # model initialisation
+    agent = Agent(seed = seed) # agent
+    store = ReplayStore(store_path, seed = seed) # memory-mapped, only the sampled rows are read
+    if not len(store):
+        store.close()
+        raise ValueError('%s holds no transitions, record some first with: python agent.py --record %s' % (store_path, store_path))
+    print('Offline training on', len(store), 'transitions')
+    td_total = 0.0 # sum of mean absolute TD errors since the last log line
+    for step in range(1, steps + 1):
+        td_errors = agent.trainer.train_step(*store.sample(batch_size)) # train step
+        td_total += float(np.abs(td_errors).mean())
+        if step % log_every == 0:
+            print('Step:', step, 'TD error:', round(td_total / log_every, 4)) # print step and mean absolute TD error
+            td_total = 0.0
+    store.close()
+    agent.model.save('model_offline.pth') # save model next to model.pth
+    return agent
 
 if __name__ == '__main__':
-    train() # train
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = 'Train the snake agent')
+    parser.add_argument('--render', action = 'store_true', help = 'show the games in a pygame window (capped at SPEED frames per second)')
+    parser.add_argument('--prioritized', action = 'store_true', help = 'prioritized experience replay for the long memory')
+    parser.add_argument('--metrics', default = 'metrics.jsonl', help = 'per-game metrics log | plot it with: python helper.py metrics.jsonl')
+    parser.add_argument('--resume', action = 'store_true', help = 'continue from the checkpoint instead of starting over')
+    parser.add_argument('--checkpoint', default = './model/checkpoint.pth', help = 'checkpoint file, written in the background')
+    parser.add_argument('--checkpoint-interval', type = int, default = 50, help = 'games between checkpoints (0 = only when training stops)')
+    parser.add_argument('--no-checkpoint-memory', action = 'store_true', help = 'leave the replay memory out of checkpoints (smaller, faster)')
+    parser.add_argument('--record', default = None, help = 'also append every transition to this on-disk replay store')
+    parser.add_argument('--offline', default = None, help = 'train from this replay store file instead of playing')
+    parser.add_argument('--offline-steps', type = int, default = 10_000, help = 'batches to train on with --offline')
+    parser.add_argument('--seed', type = int, default = None, help = 'seed for a reproducible run')
+    parser.add_argument('--trace', default = None, help = 'append a replayable trace (seed + moves) of every game to this file')
+    parser.add_argument('--observation', choices = OBSERVATIONS, default = 'features', help = 'what the agent sees: the 11 features, the full board (grid, conv network, 768 bytes per replay transition) or 8 ray-cast distances (rays)')
+    parser.add_argument('--update-every', type = int, default = 0, help = 'one update on a replay batch every this many steps instead of a single-sample update every step (0 = every step)')
+    parser.add_argument('--update-batch', type = int, default = UPDATE_BATCH, help = 'replay samples per update with --update-every')
+    parser.add_argument('--target-update', type = int, default = 0, help = 'train steps between hard syncs of a target network (0 = no target network)')
+    parser.add_argument('--tau', type = float, default = None, help = 'Polyak soft sync of the target network after every train step, e.g. 0.005 (instead of --target-update)')
+    parser.add_argument('--double', action = 'store_true', help = 'Double DQN targets (needs --target-update or --tau)')
+    parser.add_argument('--loss', choices = LOSSES, default = 'mse', help = 'TD loss')
+    parser.add_argument('--max-grad-norm', type = float, default = None, help = 'clip the gradient norm of every update')
+    parser.add_argument('--actors', type = int, default = 0, help = 'play games in this many actor processes feeding one learner (0 = single process)')
+    parser.add_argument('--sync-interval', type = int, default = 1000, help = 'actor steps between checks for new learner weights')
+    parser.add_argument('--profile', action = 'store_true', help = 'print a timing summary of the training loop every --profile-interval seconds | kill -USR1 <pid> writes a cProfile window')
+    parser.add_argument('--profile-interval', type = float, default = 30.0, help = 'seconds between profiling summaries')
+    parser.add_argument('--profile-file', default = None, help = 'also append the profiling summaries to this JSONL file')
+    parser.add_argument('--profile-port', type = int, default = None, help = 'also serve the latest summary as Prometheus text on http://127.0.0.1:PORT/metrics')
+    args = parser.parse_args()
+    if args.observation != 'features' and (args.actors > 0 or args.offline is not None):
+        parser.error('--actors and --offline train on the 11 features only')
+    if args.actors > 0 or args.offline is not None: # options only the single-process train() reads
+        single = ['render', 'resume', 'checkpoint', 'checkpoint_interval', 'no_checkpoint_memory', 'record', 'trace', 'update_every', 'update_batch',
+                  'target_update', 'tau', 'double', 'loss', 'max_grad_norm', 'profile', 'profile_interval', 'profile_file', 'profile_port']
+        unused = ['--' + name.replace('_', '-') for name in single if getattr(args, name) != parser.get_default(name)]
+        if unused:
+            parser.error('%s only apply to single-process training, not --actors or --offline' % ', '.join(unused))
+    if args.offline is not None: # options train_parallel reads but offline training has no use for
+        if args.actors > 0:
+            parser.error('--offline trains without playing, it cannot use --actors')
+        unused = ['--' + name.replace('_', '-') for name in ('prioritized', 'metrics') if getattr(args, name) != parser.get_default(name)]
+        if unused: # the store has no priorities and no games to log
+            parser.error('%s do not apply to --offline' % ', '.join(unused))
+    if args.checkpoint_interval < 0:
+        parser.error('--checkpoint-interval must be 0 or more')
+    if args.double and not (args.target_update or args.tau is not None):
+        parser.error('--double needs a target network, set --target-update or --tau')
+    if args.target_update and args.tau is not None:
+        parser.error('--target-update and --tau both sync the target network, set only one')
+    if args.offline is not None:
+        train_offline(args.offline, args.offline_steps, seed = args.seed) # no games, just the stored transitions
+    elif args.actors > 0:
+        from parallel import train_parallel
+        train_parallel(n_actors = args.actors, sync_interval = args.sync_interval, prioritized = args.prioritized, metrics_path = args.metrics, seed = 0 if args.seed is None else args.seed) # multi-process training
+    else:
+        profiler = None
+        if args.profile or args.profile_file is not None or args.profile_port is not None:
+            sinks = [PrintSink()] if args.profile else []
+            if args.profile_file is not None:
+                sinks.append(FileSink(args.profile_file))
+            if args.profile_port is not None:
+                sinks.append(PrometheusSink(args.profile_port))
+            profiler = Profiler(sinks, interval = args.profile_interval)
+        train(render = args.render, prioritized = args.prioritized, metrics_path = args.metrics, checkpoint_path = args.checkpoint,
+              checkpoint_interval = args.checkpoint_interval, checkpoint_memory = not args.no_checkpoint_memory, resume = args.resume, record_path = args.record, seed = args.seed, trace_path = args.trace, profiler = profiler, observation = args.observation,
+              update_every = args.update_every, update_batch = args.update_batch, target_update = args.target_update, tau = args.tau, double = args.double, loss = args.loss, max_grad_norm = args.max_grad_norm) # train
\ No newline at end of file
@@ -0,0 +1,228 @@
+import io
+import os
+import json
+import time
+import random
+import argparse # command line options
+import platform
+import tempfile
+import contextlib
+import threading
+import subprocess
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+from collections import deque # deque is a list-like container with fast appends and pops on either end
+from model import Linear_QNet, QTrainer # Linear_QNet is a class, QTrainer is a class
+from replay import ReplayBuffer # preallocated replay memory
+from SnakeGameAI import SnakeGameAI # SnakeGameAI is a class
+from agent import Agent, train # Agent is a class, train is the training loop
+from inference import BatchedPolicy # batched greedy moves
+from state import OBSERVATIONS # observation modes
+
+# speed checks for the hot paths of training under fixed seeds | run with: python benchmark.py --output results.json
+# compare the JSON files of two commits to spot regressions
+
+def _train_step_loop(trainer, state, action, reward, next_state, done): # the old per-sample QTrainer.train_step, kept as the baseline to compare against
+    state = torch.tensor(np.asarray(state), dtype = torch.float)
+    next_state = torch.tensor(np.asarray(next_state), dtype = torch.float)
+    action = torch.tensor(np.asarray(action), dtype = torch.long)
+    reward = torch.tensor(np.asarray(reward), dtype = torch.float)
+
+    pred = trainer.model(state)
+    target = pred.clone()
+    for idx in range(len(done)): # one forward pass per sample
+        Q_new = reward[idx]
+        if not done[idx]:
+            Q_new = reward[idx] + trainer.gamma * torch.max(trainer.model(next_state[idx]))
+        target[idx][torch.argmax(action[idx]).item()] = Q_new
+
+    trainer.optimizer.zero_grad()
+    loss = torch.nn.functional.mse_loss(target, pred) # the old nn.MSELoss() criterion
+    loss.backward()
+    trainer.optimizer.step()
+
+def _random_batch(batch_size, rng): # fake transitions shaped like the ones Agent.remember stores
+    states = rng.integers(0, 2, size = (batch_size, 11))
+    actions = np.eye(3, dtype = int)[rng.integers(0, 3, size = batch_size)]
+    rewards = rng.choice([0, 10, -10], size = batch_size, p = [0.9, 0.05, 0.05])
+    next_states = rng.integers(0, 2, size = (batch_size, 11))
+    dones = rewards == -10
+    # tuples of per-sample values, like zip(*mini_sample) in Agent.train_long_memory
+    return tuple(states), tuple(actions), tuple(rewards), tuple(next_states), tuple(dones)
+
+def _time(fn, repeat): # seconds per call, best of three rounds
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+def bench_train_step(batch_size = 1000, repeat = 5, seed = 0): # vectorized QTrainer.train_step vs the old per-sample loop
+    random.seed(seed)
+    torch.manual_seed(seed)
+    batch = _random_batch(batch_size, np.random.default_rng(seed))
+    trainer = QTrainer(Linear_QNet(11, 256, 3), lr = 0.001, gamma = 0.9)
+
+    loop = _time(lambda: _train_step_loop(trainer, *batch), repeat)
+    vectorized = _time(lambda: trainer.train_step(*batch), repeat)
+    return {'batch_size': batch_size, 'loop_ms': loop * 1000, 'vectorized_ms': vectorized * 1000, 'speedup': loop / vectorized}
+
+def bench_replay_sample(capacity = 100_000, batch_size = 1000, repeat = 20, seed = 0): # ReplayBuffer.sample vs random.sample over a deque of tuples
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    memory = deque(maxlen = capacity)
+    buffer = ReplayBuffer(capacity, 11, 3, seed = seed)
+    for transition in zip(*_random_batch(capacity, rng)):
+        memory.append(transition)
+        buffer.push(*transition)
+
+    def deque_sample(): # old Agent.train_long_memory path up to the tensors train_step builds
+        states, actions, rewards, next_states, dones = zip(*random.sample(memory, batch_size))
+        return torch.tensor(np.array(states), dtype = torch.float), torch.tensor(np.array(actions)), torch.tensor(rewards), torch.tensor(np.array(next_states), dtype = torch.float), torch.tensor(dones)
+
+    old = _time(deque_sample, repeat)
+    new = _time(lambda: buffer.sample(batch_size), repeat)
+    return {'batch_size': batch_size, 'deque_ms': old * 1000, 'buffer_ms': new * 1000, 'speedup': old / new}
+
+def _seed(seed): # same numbers on every run
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+def _random_moves(n, seed): # one-hot moves like Agent.get_action returns
+    rng = random.Random(seed)
+    moves = []
+    for _ in range(n):
+        move = [0, 0, 0]
+        move[rng.choice([0, 0, 0, 1, 2])] = 1 # mostly straight so games last a while
+        moves.append(move)
+    return moves
+
+def _played_game(steps, seed): # headless game at the position reached after some random play, for the per-call benchmarks
+    _seed(seed)
+    game = SnakeGameAI(seed = seed)
+    for move in _random_moves(steps, seed):
+        _, done, _ = game.play_step(move)
+        if done:
+            game.reset()
+    return game
+
+def bench_play_step(steps = 100_000, seed = 0): # headless SnakeGameAI.play_step steps per second (random moves, resets included)
+    _seed(seed)
+    game = SnakeGameAI(seed = seed)
+    moves = _random_moves(steps, seed)
+    start = time.perf_counter()
+    for move in moves:
+        _, done, _ = game.play_step(move)
+        if done:
+            game.reset()
+    elapsed = time.perf_counter() - start
+    return {'steps': steps, 'steps_per_s': steps / elapsed}
+
+def bench_get_state(calls = 100_000, seed = 0): # Agent.get_state calls per second | us_per_call for every observation under 'observations'
+    game = _played_game(1000, seed)
+    agent = Agent(seed = seed)
+    per_call = _time(lambda: agent.get_state(game), calls // 3)
+    observations = {}
+    for observation in OBSERVATIONS:
+        other = Agent(seed = seed, observation = observation, max_memory = 1)
+        observations[observation] = _time(lambda: other.get_state(game), calls // 3) * 1e6
+    return {'calls_per_s': 1 / per_call, 'us_per_call': per_call * 1e6, 'observations': observations}
+
+def bench_get_action(calls = 20_000, seed = 0): # Agent.get_action latency for the greedy (model) branch
+    game = _played_game(1000, seed)
+    agent = Agent(seed = seed)
+    agent.n_games = 1000 # past the exploration phase so every call runs the model
+    state = agent.get_state(game)
+    per_call = _time(lambda: agent.get_action(state), calls // 3)
+    return {'calls_per_s': 1 / per_call, 'us_per_call': per_call * 1e6}
+
+def bench_batched_inference(n_games = 64, moves = 200, seed = 0): # greedy moves/s for n_games threads through BatchedPolicy vs one model call per move
+    _seed(seed)
+    model = Linear_QNet(11, 256, 3)
+    states = np.random.default_rng(seed).integers(0, 2, size = (n_games, 11)).astype(np.uint8)
+
+    start = time.perf_counter()
+    for _ in range(moves): # one forward pass per move, like Agent.get_action
+        for state in states:
+            with torch.no_grad():
+                torch.argmax(model(torch.tensor(state, dtype = torch.float))).item()
+    single = n_games * moves / (time.perf_counter() - start)
+
+    policy = BatchedPolicy(model)
+    def play(state): # one game thread asking for moves
+        for _ in range(moves):
+            policy.act(state)
+    threads = [threading.Thread(target = play, args = (state,)) for state in states]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batched = n_games * moves / (time.perf_counter() - start)
+    mean_batch = policy.served / policy.batches
+    policy.close()
+    return {'games': n_games, 'single_moves_per_s': single, 'batched_moves_per_s': batched, 'mean_batch': mean_batch}
+
+def bench_train_games(n_games = 50, seed = 0): # end-to-end games per minute of agent.train(), headless
+    _seed(seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp: # record scores save the model to ./model and metrics go to ./metrics.jsonl, keep them away from the real ones
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): # train prints one line per game
+                start = time.perf_counter()
+                record = train(max_games = n_games, seed = seed)
+                elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return {'games': n_games, 'games_per_min': n_games / elapsed * 60, 'record': record}
+
+def _git_commit(): # commit the numbers belong to, if we are in a git checkout
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_all(seed = 0, quick = False): # every benchmark, as one JSON-ready dict
+    scale = 10 if quick else 1 # --quick runs a tenth of the work for a smoke test
+    results = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+        'play_step': bench_play_step(100_000 // scale, seed),
+        'get_state': bench_get_state(100_000 // scale, seed),
+        'get_action': bench_get_action(20_000 // scale, seed),
+        'train_step_1': bench_train_step(1, 100 // scale, seed),
+        'train_step_1000': bench_train_step(1000, 10 // scale or 1, seed),
+        'replay_sample': bench_replay_sample(batch_size = 1000, seed = seed),
+        'batched_inference': bench_batched_inference(64, 200 // scale, seed),
+        'train_games': bench_train_games(50 // scale, seed),
+    }
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Benchmark the training hot paths')
+    parser.add_argument('--output', default = 'benchmark.json', help = 'where to write the JSON results')
+    parser.add_argument('--seed', type = int, default = 0, help = 'seed for every random generator')
+    parser.add_argument('--quick', action = 'store_true', help = 'a tenth of the work, for a fast smoke test')
+    args = parser.parse_args()
+
+    results = run_all(args.seed, args.quick)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent = 2)
+
+    print('play_step: {steps_per_s:,.0f} steps/s'.format(**results['play_step']))
+    print('get_state: {calls_per_s:,.0f} calls/s'.format(**results['get_state']))
+    print('get_action: {us_per_call:.1f} us'.format(**results['get_action']))
+    for key in ('train_step_1', 'train_step_1000'):
+        print('train_step batch {batch_size}: loop {loop_ms:.2f} ms, vectorized {vectorized_ms:.2f} ms, speedup {speedup:.1f}x'.format(**results[key]))
+    print('replay sample batch {batch_size}: deque {deque_ms:.2f} ms, buffer {buffer_ms:.2f} ms, speedup {speedup:.1f}x'.format(**results['replay_sample']))
+    print('inference {games} games: single {single_moves_per_s:,.0f} moves/s, batched {batched_moves_per_s:,.0f} moves/s (mean batch {mean_batch:.1f})'.format(**results['batched_inference']))
+    print('train: {games_per_min:,.0f} games/min'.format(**results['train_games']))
+    print('wrote', args.output)
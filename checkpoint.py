@@ -0,0 +1,135 @@
+import os
+import copy
+import random
+import tempfile
+import threading
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+
+# full trainer state saved periodically from a background thread, so a crashed run can pick up where it stopped
+#   checkpoint.pth        - model, Adam state, counters and RNG states (torch.save)
+#   checkpoint_memory.npz - optional compressed replay memory snapshot
+# every file is written to a temp file in the same folder and renamed over the old one, so a crash mid-write never leaves a broken checkpoint
+
+def _atomic_write(file_name, write): # write(f) into a temp file next to file_name, then rename it into place
+    folder = os.path.dirname(file_name) or '.'
+    os.makedirs(folder, exist_ok = True)
+    fd, tmp = tempfile.mkstemp(dir = folder, prefix = '.tmp_', suffix = os.path.splitext(file_name)[1])
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno()) # on disk before it replaces the old file
+        os.chmod(tmp, 0o644) # mkstemp creates owner-only files
+        os.replace(tmp, file_name) # atomic on the same file system
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def memory_file(file_name): # replay memory snapshot that goes with a checkpoint file
+    return os.path.splitext(file_name)[0] + '_memory.npz'
+
+def snapshot(agent, save_memory = True, game = None, **counters): # copy everything needed to resume | runs on the training thread, cheap compared to writing | game = SnakeGameAI whose seed stream is saved too
+    state = {
+        'model': {k: v.detach().clone() for k, v in agent.model.state_dict().items()},
+        'optimizer': copy.deepcopy(agent.trainer.optimizer.state_dict()), # Adam moments and step counts
+        'n_games': agent.n_games, # drives the epsilon schedule
+        'steps': agent.steps, # drives update_every
+        'updates': agent.trainer.updates, # drives the target network syncs
+        'target_model': None if agent.trainer.target_model is agent.model else {k: v.detach().clone() for k, v in agent.trainer.target_model.state_dict().items()},
+        'counters': counters, # record, metrics totals, ...
+        'rng': {
+            'random': random.getstate(),
+            'agent': agent.rng.getstate(), # exploration
+            'numpy': np.random.get_state(),
+            'torch': torch.get_rng_state(),
+            'memory': agent.memory.rng.bit_generator.state,
+        },
+        'game': None if game is None else {'seed_rng': game.seed_rng.getstate(), 'episode_seed': game.episode_seed}, # so a resumed run plays the same games as an uninterrupted one
+    }
+    memory = None
+    if save_memory:
+        memory = {k: np.copy(v) for k, v in agent.memory.state_dict().items()} # the training thread keeps writing to the live arrays
+        memory['n_games'] = np.array(agent.n_games) # to match it with its checkpoint
+    return state, memory
+
+def write(file_name, state, memory = None): # write a snapshot to disk | memory first, so the checkpoint never points at an older replay snapshot than its own
+    if memory is not None:
+        _atomic_write(memory_file(file_name), lambda f: np.savez_compressed(f, **memory))
+    _atomic_write(file_name, lambda f: torch.save(state, f))
+
+def load(file_name): # checkpoint dict, with its replay memory snapshot under 'memory' if there is one
+    state = torch.load(file_name, map_location = 'cpu', weights_only = False) # our own file, holds numpy RNG state
+    state['memory'] = None
+    if os.path.exists(memory_file(file_name)):
+        with np.load(memory_file(file_name)) as memory:
+            state['memory'] = {k: memory[k] for k in memory.files}
+        if int(state['memory']['n_games']) != state['n_games']: # crashed between the two renames
+            print('Checkpoint: replay memory snapshot is from game', int(state['memory']['n_games']), 'not', state['n_games'])
+    return state
+
+def restore(agent, state, game = None): # load a checkpoint dict into agent, and game's seed stream if given | returns the saved counters
+    agent.model.load_state_dict(state['model'])
+    agent.trainer.optimizer.load_state_dict(state['optimizer'])
+    agent.n_games = state['n_games']
+    agent.steps = state.get('steps', 0) # older checkpoints had no update cadence or target network
+    agent.trainer.updates = state.get('updates', 0)
+    if state.get('target_model') is not None and agent.trainer.target_model is not agent.model:
+        agent.trainer.target_model.load_state_dict(state['target_model'])
+    elif agent.trainer.target_model is not agent.model: # no saved target network: start it from the restored model
+        agent.trainer.target_model.load_state_dict(state['model'])
+    random.setstate(state['rng']['random'])
+    if 'agent' in state['rng']: # older checkpoints explored with the global random module
+        agent.rng.setstate(state['rng']['agent'])
+    np.random.set_state(state['rng']['numpy'])
+    torch.set_rng_state(state['rng']['torch'])
+    agent.memory.rng.bit_generator.state = state['rng']['memory']
+    if state['memory'] is not None:
+        agent.memory.load_state_dict(state['memory'])
+    if game is not None and state.get('game') is not None: # older checkpoints restarted the seed stream
+        game.seed_rng.setstate(state['game']['seed_rng'])
+        game.reset(seed = state['game']['episode_seed']) # replay the game that was in progress from its start
+    return state['counters']
+
+class Checkpointer: # periodic checkpoints written by a background thread
+    def __init__(self, file_name = './model/checkpoint.pth', interval = 50, save_memory = True): # interval = games between checkpoints (0 = off), save_memory = include the replay memory
+        self.file_name = file_name
+        self.interval = interval
+        self.save_memory = save_memory
+        self.pending = None # newest snapshot not written yet | an older unwritten one is simply replaced
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target = self._writer, daemon = True)
+        self.thread.start()
+
+    def maybe_save(self, agent, game = None, **counters): # call after every game | checkpoints every interval games (0 = never, only explicit save() calls)
+        if self.interval and agent.n_games % self.interval == 0:
+            self.save(agent, game, **counters)
+
+    def save(self, agent, game = None, **counters): # snapshot now, write in the background
+        snap = snapshot(agent, self.save_memory, game, **counters)
+        with self.lock:
+            self.pending = snap
+        self.wake.set()
+
+    def _writer(self): # background thread
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                snap, self.pending = self.pending, None
+            if snap is not None:
+                try:
+                    write(self.file_name, *snap)
+                except Exception as e: # keep training, the next checkpoint may succeed
+                    print('Checkpoint failed:', e)
+            with self.lock:
+                if self.pending is None and self.closed:
+                    return
+
+    def close(self): # wait for the last checkpoint to reach the disk
+        with self.lock:
+            self.closed = True
+        self.wake.set()
+        self.thread.join()
@@ -0,0 +1,116 @@
+import time
+import struct
+import argparse # command line options
+from collections import namedtuple # namedtuple is a tuple subclass that allows us to refer to each value in the tuple by a name
+import numpy as np # numpy is a library for scientific computing
+from SnakeGameAI import SnakeGameAI # SnakeGameAI is a class
+
+# compact binary game traces: a game's seed plus its moves rebuild the game exactly (food comes from SnakeGameAI.rng)
+# a trace file is a list of records, one per game:
+#   header  '<4sBHHQII' = magic b'SNKT', version, width, height, game seed, number of moves, final score
+#   moves   2 bits per move (0 = straight, 1 = right, 2 = left), four moves per byte
+# replay with: python episode_trace.py games.trace [--game N | --best] [--render]
+
+MAGIC = b'SNKT'
+VERSION = 2 # 2: food drawn from the free-cell index, version 1 games no longer replay to the same food
+HEADER = struct.Struct('<4sBHHQII')
+
+Trace = namedtuple('Trace', 'w, h, seed, moves, score') # moves = uint8 array of move indexes
+
+def pack_moves(moves): # move indexes -> 2 bits each
+    moves = np.asarray(moves, dtype = np.uint8)
+    padded = np.zeros(-(-len(moves) // 4) * 4, dtype = np.uint8) # round up to whole bytes
+    padded[:len(moves)] = moves
+    return (padded[0::4] | padded[1::4] << 2 | padded[2::4] << 4 | padded[3::4] << 6).tobytes()
+
+def unpack_moves(data, n): # 2-bit packed bytes -> n move indexes
+    packed = np.frombuffer(data, dtype = np.uint8)
+    moves = np.empty(len(packed) * 4, dtype = np.uint8)
+    for i in range(4):
+        moves[i::4] = (packed >> (2 * i)) & 3
+    return moves[:n]
+
+class TraceRecorder: # appends one record per finished game to a trace file
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        self.moves = bytearray() # move indexes of the current game
+
+    def start(self, game): # call right after game.reset()
+        self.w, self.h, self.seed = game.w, game.h, game.episode_seed
+        self.moves = bytearray()
+
+    def add(self, move): # one-hot move [straight, right, left] as passed to play_step
+        self.moves.append(int(np.argmax(move)))
+
+    def finish(self, score): # write the game that just ended
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.w, self.h, self.seed, len(self.moves), score))
+        self.file.write(pack_moves(self.moves))
+        self.file.flush() # a crash should not lose finished games
+
+    def offset(self): # file size after the last finished game, for checkpoints
+        return self.file.tell()
+
+    def truncate(self, offset): # drop the games written after offset | games a crashed run played past its checkpoint
+        if offset < self.file.tell():
+            self.file.truncate(offset)
+
+    def close(self):
+        self.file.close()
+
+def read_traces(path): # every game in a trace file
+    traces = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    pos = 0
+    while pos < len(data):
+        magic, version, w, h, seed, n, score = HEADER.unpack_from(data, pos)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s: not a version %d snake trace at byte %d' % (path, VERSION, pos))
+        pos += HEADER.size
+        size = -(-n // 4)
+        traces.append(Trace(w, h, seed, unpack_moves(data[pos:pos + size], n), score))
+        pos += size
+    return traces
+
+def replay(trace, render = False): # play a trace back | returns the final score, which must match trace.score
+    game = SnakeGameAI(trace.w, trace.h, render = render)
+    game.reset(seed = trace.seed) # same food sequence as the recorded game
+    moves = np.eye(3, dtype = int).tolist() # one-hot move for each index
+    score = 0
+    done = False
+    for i, move in enumerate(trace.moves):
+        if done:
+            raise ValueError('trace continues after game over at move %d' % i)
+        _, done, score = game.play_step(moves[move])
+    return score
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Replay recorded games')
+    parser.add_argument('path', help = 'trace file written by agent.py --trace')
+    parser.add_argument('--game', type = int, default = None, help = 'replay only this game (1 = first)')
+    parser.add_argument('--best', action = 'store_true', help = 'replay only the highest scoring game')
+    parser.add_argument('--render', action = 'store_true', help = 'watch the replay in a pygame window')
+    args = parser.parse_args()
+
+    traces = read_traces(args.path)
+    if args.best:
+        best = max(range(len(traces)), key = lambda i: traces[i].score)
+        selected = [(best + 1, traces[best])]
+    elif args.game is not None:
+        selected = [(args.game, traces[args.game - 1])]
+    else:
+        selected = list(enumerate(traces, 1))
+
+    start = time.perf_counter()
+    steps = 0
+    mismatches = 0
+    for number, trace in selected:
+        score = replay(trace, render = args.render)
+        steps += len(trace.moves)
+        if score != trace.score:
+            mismatches += 1
+            print('Game', number, 'replayed to score', score, 'but recorded', trace.score)
+        elif args.render or len(selected) == 1:
+            print('Game', number, 'Score:', score, 'Moves:', len(trace.moves))
+    elapsed = time.perf_counter() - start
+    print('Replayed', len(selected), 'games,', steps, 'moves in', round(elapsed, 2), 's,', mismatches, 'mismatches')
@@ -0,0 +1,79 @@
+import os
+import warnings
+import argparse # command line options
+import numpy as np # numpy is a library for scientific computing
+
+# frozen copies of a trained Linear_QNet for evaluation and demo runs
+#   model.pt  - TorchScript module, runs without the model.py source
+#   model.npz - plain weights for NumpyQNet, which needs numpy only (no torch import at all)
+# torch is only imported inside export(), so evaluation workers can import NumpyQNet from here cheaply
+
+class NumpyQNet: # relu(x @ W1 + b1) @ W2 + b2, the same maths as Linear_QNet.forward
+    def __init__(self, w1, b1, w2, b2): # w1 = (input, hidden), w2 = (hidden, output) | transposed from nn.Linear's (out, in) layout
+        self.w1 = np.ascontiguousarray(w1, dtype = np.float32)
+        self.b1 = np.ascontiguousarray(b1, dtype = np.float32)
+        self.w2 = np.ascontiguousarray(w2, dtype = np.float32)
+        self.b2 = np.ascontiguousarray(b2, dtype = np.float32)
+
+    @classmethod
+    def load(cls, file_name = './model/model.npz'): # weights written by export()
+        with np.load(file_name) as weights:
+            return cls(weights['w1'], weights['b1'], weights['w2'], weights['b2'])
+
+    def __call__(self, x): # Q values for one state (11,) -> (3,) or a batch (N, 11) -> (N, 3)
+        x = np.asarray(x, dtype = np.float32)
+        hidden = x @ self.w1 + self.b1
+        np.maximum(hidden, 0, out = hidden) # relu activation function, in place
+        return hidden @ self.w2 + self.b2
+
+    def act(self, state): # greedy one-hot move [straight, right, left] like Agent.get_action without exploration
+        final_move = [0, 0, 0]
+        final_move[int(np.argmax(self(state)))] = 1 # set index to 1
+        return final_move
+
+    def act_batch(self, states): # (N,) greedy move indexes for a batch of states
+        return np.argmax(self(states), axis = 1)
+
+def export(file_name = './model/model.pth', out_dir = './model'): # write model.pt (TorchScript) and model.npz (numpy weights) next to the trained model
+    import torch # pytorch | only needed to export, not to evaluate with NumpyQNet
+    from model import Linear_QNet # Linear_QNet is a class
+
+    state_dict = torch.load(file_name, map_location = 'cpu') # the state_dict saved by Linear_QNet.save
+    if set(state_dict) != {'linear1.weight', 'linear1.bias', 'linear2.weight', 'linear2.bias'}: # Conv_QNet and Ray_QNet have more layers or buffers
+        raise ValueError('%s is not a Linear_QNet state_dict (keys: %s), only the 11-feature model can be exported' % (file_name, ', '.join(sorted(state_dict))))
+    hidden_size, input_size = state_dict['linear1.weight'].shape
+    output_size = state_dict['linear2.weight'].shape[0]
+    model = Linear_QNet(input_size, hidden_size, output_size)
+    model.load_state_dict(state_dict)
+    model.eval()
+
+    os.makedirs(out_dir, exist_ok = True)
+    script_path = os.path.join(out_dir, 'model.pt')
+    with warnings.catch_warnings(): # newer torch marks TorchScript as deprecated, it still loads anywhere with torch.jit.load
+        warnings.simplefilter('ignore', FutureWarning)
+        traced = torch.jit.trace(model, torch.zeros(1, input_size)) # the forward pass has no control flow, so tracing captures it fully
+        traced = torch.jit.freeze(traced) # fold the weights in as constants
+        torch.jit.save(traced, script_path)
+
+    npz_path = os.path.join(out_dir, 'model.npz')
+    np.savez(npz_path,
+        w1 = state_dict['linear1.weight'].numpy().T, b1 = state_dict['linear1.bias'].numpy(),
+        w2 = state_dict['linear2.weight'].numpy().T, b2 = state_dict['linear2.bias'].numpy())
+
+    # both artifacts must agree with the original model
+    check = torch.randint(0, 2, (64, input_size)).float()
+    with torch.no_grad(): # explicit checks, asserts are stripped under python -O
+        expected = model(check).numpy()
+        if not np.allclose(traced(check).numpy(), expected, atol = 1e-5):
+            raise ValueError('TorchScript export %s does not match the model' % script_path)
+    if not np.allclose(NumpyQNet.load(npz_path)(check.numpy()), expected, atol = 1e-5):
+        raise ValueError('numpy export %s does not match the model' % npz_path)
+    return script_path, npz_path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Export a trained model for fast evaluation')
+    parser.add_argument('--model', default = './model/model.pth', help = 'state_dict saved by Linear_QNet.save')
+    parser.add_argument('--out-dir', default = './model', help = 'where to write model.pt and model.npz')
+    args = parser.parse_args()
+    for path in export(args.model, args.out_dir):
+        print('wrote', path)
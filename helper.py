@@ -1,19 +1,80 @@
+import json
+import argparse # command line options
 import matplotlib.pyplot as plt # for plotting
-from IPython import display # for live plot
-
-plt.ion() # turn on interactive mode
-
-def plot(scores, mean_scores): # plot scores and mean scores
-    display.clear_output(wait=True) # clear output
-    display.display(plt.gcf()) # display
-    plt.clf() # clear plot
-    plt.title('Training...') # title
-    plt.xlabel('Number of Games') # x label
-    plt.ylabel('Score') # y label
-    plt.plot(scores) # plot scores
-    plt.plot(mean_scores) # plot mean scores
-    plt.ylim(ymin=0) # set y min
-    plt.text(len(scores)-1, scores[-1], str(scores[-1])) # set text
-    plt.text(len(mean_scores)-1, mean_scores[-1], str(mean_scores[-1])) # set text
-    plt.show(block=False) # show plot
-    plt.pause(.1) # pause plot
\ No newline at end of file
+
+# live plot of a training run, separate from training | reads the JSONL log written by metrics.MetricsLogger
+# run with: python helper.py metrics.jsonl
+
+class DecimatedSeries: # keeps at most about max_points evenly spaced points of a growing series
+    def __init__(self, max_points = 2000):
+        self.max_points = max_points
+        self.stride = 1 # keep every stride-th point
+        self.x = [] # game numbers
+        self.y = [] # values
+        self.count = 0 # points seen
+
+    def append(self, x, y):
+        if self.count % self.stride == 0:
+            self.x.append(x)
+            self.y.append(y)
+            if len(self.x) > self.max_points: # too many points: keep every other one and double the stride
+                self.x = self.x[::2]
+                self.y = self.y[::2]
+                self.stride *= 2
+        self.count += 1
+
+def follow(f): # new complete lines appended to an open file since the last call
+    rows = []
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        if not line.endswith('\n'): # nothing new, or the writer is mid-line
+            f.seek(pos)
+            return rows
+        rows.append(json.loads(line))
+
+def view(path = 'metrics.jsonl', max_points = 2000, interval = 1.0): # redraw the plot every interval seconds while the log grows
+    scores = DecimatedSeries(max_points) # score per game
+    mean_scores = DecimatedSeries(max_points) # mean score
+    rolling_means = DecimatedSeries(max_points) # rolling mean score
+    last = None # latest row
+
+    plt.ion() # turn on interactive mode
+    fig, ax = plt.subplots()
+    while True:
+        try:
+            f = open(path)
+            break
+        except FileNotFoundError: # training has not logged its first game yet
+            plt.pause(interval)
+
+    with f:
+        while plt.fignum_exists(fig.number): # until the window is closed
+            rows = follow(f)
+            for row in rows:
+                scores.append(row['game'], row['score'])
+                mean_scores.append(row['game'], row['mean_score'])
+                rolling_means.append(row['game'], row['rolling_mean'])
+                last = row
+
+            if rows: # only redraw when there is something new
+                ax.clear() # clear plot
+                ax.set_title('Training...') # title
+                ax.set_xlabel('Number of Games') # x label
+                ax.set_ylabel('Score') # y label
+                ax.plot(scores.x, scores.y, label = 'score') # plot scores
+                ax.plot(mean_scores.x, mean_scores.y, label = 'mean') # plot mean scores
+                ax.plot(rolling_means.x, rolling_means.y, label = 'rolling mean') # plot rolling mean scores
+                ax.set_ylim(ymin = 0) # set y min
+                ax.text(last['game'], last['score'], str(last['score'])) # set text
+                ax.text(last['game'], last['mean_score'], '%.2f' % last['mean_score']) # set text
+                ax.legend(loc = 'upper left')
+            plt.pause(interval) # draw and wait for more games
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Plot a training run from its metrics log')
+    parser.add_argument('path', nargs = '?', default = 'metrics.jsonl', help = 'JSONL file written by train()')
+    parser.add_argument('--max-points', type = int, default = 2000, help = 'most points drawn per line')
+    parser.add_argument('--interval', type = float, default = 1.0, help = 'seconds between redraws')
+    args = parser.parse_args()
+    view(args.path, args.max_points, args.interval)
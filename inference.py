@@ -0,0 +1,78 @@
+import time
+import queue
+import asyncio
+import threading
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+from concurrent.futures import Future
+
+# greedy moves for many games at once: requests from threads or asyncio tasks are gathered into one forward pass
+
+class BatchedPolicy:
+    def __init__(self, model, state_size = 11, max_batch = 256, max_wait = 0.002): # max_batch = most states per forward pass, max_wait = seconds the first request waits for company
+        self.model = model # model | shared, so weight updates from a trainer are picked up on the next batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.inputs = np.zeros((max_batch, state_size), dtype = np.float32) # preallocated model input
+        self.inputs_tensor = torch.from_numpy(self.inputs) # shares memory with self.inputs
+        self.requests = queue.SimpleQueue() # (state, future) pairs waiting for a batch
+        self.batches = 0 # forward passes run
+        self.served = 0 # states answered
+        self._stop = False
+        self.thread = threading.Thread(target = self._serve, daemon = True)
+        self.thread.start()
+
+    def submit(self, state): # queue one state | returns a Future holding the one-hot move [straight, right, left]
+        future = Future()
+        self.requests.put((state, future))
+        return future
+
+    def act(self, state): # blocking move for one state, for game threads
+        return self.submit(state).result()
+
+    async def act_async(self, state): # awaitable move for one state, for asyncio tasks
+        return await asyncio.wrap_future(self.submit(state))
+
+    def _collect(self): # block for the first request, then take more until the batch is full or max_wait has passed
+        pending = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                pending.append(self.requests.get_nowait() if timeout <= 0 else self.requests.get(timeout = timeout))
+            except queue.Empty:
+                break
+        return pending
+
+    def _serve(self): # background thread: one inference_mode forward pass per batch
+        while True:
+            pending = self._collect()
+            if self._stop:
+                for _, future in pending:
+                    if future is not None:
+                        future.cancel()
+                return
+            pending = [(state, future) for state, future in pending if future is not None and future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            n = len(pending)
+            for i, (state, _) in enumerate(pending):
+                self.inputs[i] = state
+            try:
+                with torch.inference_mode(): # no autograd bookkeeping at all
+                    moves = self.model(self.inputs_tensor[:n]).argmax(dim = 1).tolist() # index of greatest value for each state
+            except Exception as e: # hand the error to every waiting caller instead of killing the thread
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for (_, future), move in zip(pending, moves):
+                final_move = [0, 0, 0]
+                final_move[move] = 1 # set index to 1
+                future.set_result(final_move)
+            self.batches += 1
+            self.served += n
+
+    def close(self): # stop the server thread, cancelling anything still queued
+        self._stop = True
+        self.requests.put((None, None)) # wake the thread up
+        self.thread.join()
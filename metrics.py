@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque # deque is a list-like container with fast appends and pops on either end
+
+# per-game metrics appended to a JSONL file by a background thread, so the training loop never waits on disk or plotting
+# watch a run with: python helper.py metrics.jsonl
+
+class MetricsLogger:
+    def __init__(self, path = 'metrics.jsonl', window = 100): # path = append-only log file, window = games in the rolling mean
+        self.path = path
+        self.window = deque(maxlen = window) # last scores for the rolling mean | bounded, unlike the old plot lists
+        self.window_total = 0 # sum of the scores in the window
+        self.total_score = 0 # total score
+        self.n_games = 0 # games logged
+        self.start = time.time()
+        self.queue = queue.SimpleQueue() # records waiting to be written
+        self.thread = threading.Thread(target = self._writer, daemon = True)
+        self.thread.start()
+
+    def log(self, score, record, **extra): # record one finished game | returns immediately
+        self.n_games += 1
+        self.total_score += score
+        if len(self.window) == self.window.maxlen: # oldest score leaves the window
+            self.window_total -= self.window[0]
+        self.window.append(score)
+        self.window_total += score
+        row = {
+            'game': self.n_games,
+            'score': score,
+            'record': record,
+            'mean_score': self.total_score / self.n_games, # mean over every game so far
+            'rolling_mean': self.window_total / len(self.window), # mean over the last window games
+            'time': round(time.time() - self.start, 3), # seconds since training started
+        }
+        row.update(extra)
+        self.queue.put(row)
+        return row
+
+    def state_dict(self): # running totals, for checkpoints
+        return {'n_games': self.n_games, 'total_score': self.total_score, 'window': list(self.window)}
+
+    def load_state_dict(self, state): # continue the totals of a resumed run | also drops the rows logged after them, see rollback()
+        self.n_games = state['n_games']
+        self.total_score = state['total_score']
+        self.window.clear()
+        self.window.extend(state['window'])
+        self.window_total = sum(self.window)
+        self.rollback()
+
+    def rollback(self): # cut the rows after game n_games off the end of the file | a crashed run logged games its checkpoint does not have, the resumed run logs them again
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f: # the writer appends through its own handle, which always writes at the new end
+            data = f.read()
+            end = len(data)
+            while end > 0:
+                start = data.rfind(b'\n', 0, end - 1) + 1 # start of the last line before end
+                try:
+                    game = json.loads(data[start:end])['game']
+                except (ValueError, KeyError): # a line cut short by the crash
+                    game = None
+                if game is not None and game <= self.n_games:
+                    break
+                end = start
+            if end < len(data):
+                f.truncate(end)
+
+    def _writer(self): # background thread: append each record as one JSON line
+        with open(self.path, 'a') as f:
+            while True:
+                row = self.queue.get()
+                if row is None: # close()
+                    break
+                f.write(json.dumps(row) + '\n')
+                if self.queue.empty(): # flush once per burst so a viewer sees new games quickly
+                    f.flush()
+
+    def close(self): # write everything still queued and stop the thread
+        self.queue.put(None)
+        self.thread.join()
@@ -3,8 +3,24 @@ import torch.nn as nn # neural network
 import torch.optim as optim # optimizer
 import torch.nn.functional as F # relu, tanh, etc.
 import os # for saving and loading models
+import copy # target network copy
+import numpy as np # numpy is a library for scientific computing
 
-class Linear_QNet(nn.Module): # neural network class
+def _to_tensor(x, dtype): # tensors from ReplayBuffer.sample pass straight through, arrays and tuples of arrays convert in one go
+    if not isinstance(x, torch.Tensor):
+        x = np.asarray(x)
+    return torch.as_tensor(x, dtype = dtype)
+
+class QNet(nn.Module): # save for the Q networks below
+    def save(self, file_name = 'model.pth'): # save model
+        model_folder_path = './model' # model folder path
+        if not os.path.exists(model_folder_path): # if model folder does not exist
+            os.makedirs(model_folder_path) # create model folder
+
+        file_name = os.path.join(model_folder_path, file_name) # file path
+        torch.save(self.state_dict(), file_name) # save model
+
+class Linear_QNet(QNet): # neural network class
     def __init__(self, input_size, hidden_size, output_size): 
         super().__init__()  # super class
         self.linear1 = nn.Linear(input_size, hidden_size) # input layer
@@ -14,50 +30,115 @@ class Linear_QNet(nn.Module): # neural network class
         x = F.relu(self.linear1(x)) # relu activation function
         x = self.linear2(x) # output layer
         return x # return output
-    
-    def save(self, file_name = 'model.pth'): # save model
-        model_folder_path = './model' # model folder path
-        if not os.path.exists(model_folder_path): # if model folder does not exist
-            os.makedirs(model_folder_path) # create model folder
 
-        file_name = os.path.join(model_folder_path, file_name) # file path
-        torch.save(self.state_dict(), file_name) # save model
+class Ray_QNet(Linear_QNet): # Linear_QNet for state.RayEncoder states | scales the ray distances to 0..1 first
+    def __init__(self, input_size, hidden_size, output_size, scale): # scale = per-feature input scale (RayEncoder.scale)
+        super().__init__(input_size, hidden_size, output_size)
+        self.register_buffer('scale', torch.as_tensor(scale, dtype = torch.float)) # saved with the weights
+
+    def forward(self, x):
+        return super().forward(x * self.scale)
+
+class Conv_QNet(QNet): # small conv network for state.GridEncoder board planes (channels, rows, cols)
+    def __init__(self, channels, rows, cols, hidden_size, output_size):
+        super().__init__()
+        self.conv1 = nn.Conv2d(channels, 16, 3, stride = 2, padding = 1) # half resolution
+        self.conv2 = nn.Conv2d(16, 32, 3, stride = 2, padding = 1) # quarter resolution
+        flat = 32 * ((rows + 3) // 4) * ((cols + 3) // 4) # conv2 output size
+        self.linear1 = nn.Linear(flat, hidden_size)
+        self.linear2 = nn.Linear(hidden_size, output_size)
+
+    def forward(self, x): # (N, channels, rows, cols) -> (N, 3), or one board (channels, rows, cols) -> (3,)
+        single = x.dim() == 3
+        if single:
+            x = x.unsqueeze(0)
+        x = F.relu(self.conv1(x))
+        x = F.relu(self.conv2(x))
+        x = F.relu(self.linear1(x.flatten(1)))
+        x = self.linear2(x)
+        return x[0] if single else x
+
+LOSSES = ('mse', 'huber') # QTrainer loss functions
 
 class QTrainer: # Q-learning class
-    def __init__(self, model, lr, gamma):
+    def __init__(self, model, lr, gamma, target_update = 0, tau = None, double = False, loss = 'mse', max_grad_norm = None):
+        # target_update = train steps between hard copies of model into a target network that computes the bootstrap targets (0 = no target network)
+        # tau = instead update the target network every train step as target = (1 - tau) * target + tau * model (Polyak averaging)
+        # double = Double DQN, the model picks the next action and the target network values it | loss = 'mse' or 'huber', max_grad_norm = clip the gradient norm (None = off)
         self.lr = lr # learning rate
         self.gamma = gamma # discount rate
         self.model = model # model
         self.optimizer = optim.Adam(model.parameters(), lr = self.lr) # optimizer | Adam is a type of optimizer
-        self.criterion = nn.MSELoss() # loss function
+        if loss not in LOSSES:
+            raise ValueError('unknown loss %r, expected one of %s' % (loss, ', '.join(LOSSES)))
+        if target_update and tau is not None:
+            raise ValueError('target_update and tau are two ways to sync the target network, set only one')
+        if double and not (target_update or tau is not None):
+            raise ValueError('double needs a target network, set target_update or tau')
+        if loss == 'huber':
+            self.criterion = nn.HuberLoss(reduction = 'none') # quadratic near 0, linear for large TD errors
+        else:
+            self.criterion = nn.MSELoss(reduction = 'none') # loss function | per-element so samples can be weighted
+        self.target_update = target_update
+        self.tau = tau
+        self.double = double
+        self.max_grad_norm = max_grad_norm
+        self.target_model = model # bootstraps from the model itself unless a target network is asked for
+        if target_update or tau is not None:
+            self.target_model = copy.deepcopy(model) # frozen copy, only changed by the syncs below
+            self.target_model.requires_grad_(False)
+        self.updates = 0 # train steps so far, drives the hard syncs
+        self.last_loss = None # loss of the latest train_step, kept as a tensor so reading it is left to whoever wants it (profiler.py)
 
+    def sync_target(self): # bring the target network up to date after a train step
+        if self.target_model is self.model:
+            return
+        if self.tau is not None: # soft: move a tau fraction of the way towards the model
+            with torch.no_grad():
+                for target, param in zip(self.target_model.parameters(), self.model.parameters()):
+                    target.lerp_(param, self.tau)
+        elif self.updates % self.target_update == 0: # hard: copy every target_update steps
+            self.target_model.load_state_dict(self.model.state_dict())
 
-    def train_step(self, state, action, reward, next_state, done): # train step
-        state = torch.tensor(state, dtype = torch.float) # convert to tensor
-        next_state = torch.tensor(next_state, dtype = torch.float) # convert to tensor
-        action = torch.tensor(action, dtype = torch.long) # convert to tensor
-        reward = torch.tensor(reward, dtype = torch.float) # convert to tensor
+    def train_step(self, state, action, reward, next_state, done, weights = None): # train step | weights = importance-sampling weights from prioritized replay | returns the TD errors
+        state = _to_tensor(state, torch.float) # convert to tensor
+        next_state = _to_tensor(next_state, torch.float) # convert to tensor
+        action = _to_tensor(action, torch.long) # convert to tensor
+        reward = _to_tensor(reward, torch.float) # convert to tensor
+        done = _to_tensor(done, torch.bool) # convert to tensor
 
-        if len(state.shape) == 1: # if state is 1D
+        if action.dim() == 1: # single transition | states may be 1D features or board planes
             state = torch.unsqueeze(state, 0) # add a dimension to the tensor
             next_state = torch.unsqueeze(next_state, 0) # add a dimension to the tensor
             action = torch.unsqueeze(action, 0) # add a dimension to the tensor
             reward = torch.unsqueeze(reward, 0) # add a dimension to the tensor
-            done = (done, ) # convert to tuple
+            done = torch.unsqueeze(done, 0) # add a dimension to the tensor
 
         # 1: predicted Q values with current state
         pred = self.model(state)
 
         # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
-        target = pred.clone() # clone pred
-        for idx in range(len(done)): # for each done
-            Q_new = reward[idx] # if done, Q_new = reward
-            if not done[idx]:
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx])) # if not done, Q_new = reward + gamma * max(next_predicted Q value)
-            
-            target[idx][torch.argmax(action[idx]).item()] = Q_new # target = pred | .item() gets the value of the tensor
+        with torch.no_grad(): # the target is a constant for the update, one batched forward pass for every next state
+            if self.double and self.target_model is not self.model: # Double DQN: online model picks the action, target network values it
+                next_action = self.model(next_state).argmax(dim = 1, keepdim = True)
+                next_q = self.target_model(next_state).gather(1, next_action).squeeze(1)
+            else:
+                next_q = self.target_model(next_state).max(dim = 1).values # max(next_predicted Q value) for each sample
+            Q_new = reward + self.gamma * next_q * (~done) # if done, Q_new = reward
+            target = pred.detach().clone() # clone pred
+            target.scatter_(1, action.argmax(dim = 1, keepdim = True), Q_new.unsqueeze(1)) # target[idx][argmax(action[idx])] = Q_new[idx] for the whole batch
 
         self.optimizer.zero_grad() # zero gradients
-        loss = self.criterion(target, pred) # calculate loss
+        loss = self.criterion(pred, target).mean(dim = 1) # calculate loss for each sample
+        if weights is not None: # prioritized replay: scale each sample by its importance-sampling weight
+            loss = loss * weights
+        loss = loss.mean() # same value as nn.MSELoss() when unweighted
         loss.backward() # backpropagation
-        self.optimizer.step() # update weights
\ No newline at end of file
+        if self.max_grad_norm is not None:
+            nn.utils.clip_grad_norm_(self.model.parameters(), self.max_grad_norm) # one bad batch cannot throw the weights far
+        self.optimizer.step() # update weights
+        self.last_loss = loss.detach()
+        self.updates += 1
+        self.sync_target()
+
+        return (target - pred.detach()).sum(dim = 1).numpy() # TD error Q_new - Q(state, action) | only the action column differs
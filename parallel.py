@@ -0,0 +1,116 @@
+import queue
+import random
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+import torch.multiprocessing as mp # multiprocessing that can share tensors between processes
+from SnakeGameAI import SnakeGameAI # SnakeGameAI is a class
+from model import Linear_QNet # Linear_QNet is a class
+from agent import Agent, HIDDEN_SIZE # Agent is a class, HIDDEN_SIZE is a constant
+from metrics import MetricsLogger # background writer for per-game metrics
+
+# K actor processes play headless games with a copy of the model and stream transitions to one learner (the main process)
+# the learner owns the QTrainer and the replay memory and publishes new weights through a model in shared memory
+
+CHUNK_SIZE = 256 # transitions an actor collects before sending them to the learner
+PUT_TIMEOUT = 0.5 # seconds an actor waits on a full queue before checking stop again
+
+def actor(actor_id, shared_model, version, lock, transitions, scores, stop, sync_interval, seed): # runs in its own process
+    torch.set_num_threads(1) # one core per actor
+    transitions.cancel_join_thread() # exit without waiting for unsent chunks once the learner stops reading
+    scores.cancel_join_thread()
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    random.seed(seed)
+
+    agent = Agent(seed = seed) # only its model, get_state and get_action are used here
+    game = SnakeGameAI(seed = seed) # headless
+    local_version = -1 # version of the shared weights copied into agent.model
+    chunk = [] # transitions not sent yet
+    steps = 0
+    while not stop.is_set():
+        if steps % sync_interval == 0 and version.value != local_version: # pick up the learner's newest weights
+            with lock:
+                agent.model.load_state_dict(shared_model.state_dict())
+                local_version = version.value
+
+        state_old = agent.get_state(game)
+        final_move = agent.get_action(state_old)
+        reward, done, score = game.play_step(final_move)
+        state_new = agent.get_state(game)
+        chunk.append((state_old, final_move, reward, state_new, done))
+        steps += 1
+
+        if done:
+            game.reset()
+            agent.n_games += 1 # per-actor game count drives the epsilon decay
+            scores.put((actor_id, score))
+
+        if len(chunk) >= CHUNK_SIZE or done: # send whole arrays, not one pickled tuple per transition
+            states, actions, rewards, next_states, dones = zip(*chunk)
+            batch = (np.array(states, dtype = np.uint8), np.array(actions, dtype = np.uint8), np.array(rewards, dtype = np.float32), np.array(next_states, dtype = np.uint8), np.array(dones, dtype = bool))
+            chunk = []
+            while not stop.is_set(): # the learner may have stopped reading, never block past stop
+                try:
+                    transitions.put(batch, timeout = PUT_TIMEOUT)
+                    break
+                except queue.Full:
+                    continue
+
+def train_parallel(n_actors = 4, sync_interval = 1000, publish_interval = 10, prioritized = False, max_games = None, seed = 0, metrics_path = 'metrics.jsonl'): # n_actors = actor processes, sync_interval = actor steps between weight checks, publish_interval = learner updates between weight publishes
+    ctx = mp.get_context('spawn') # fresh interpreters, safe with torch threads
+    torch.manual_seed(seed)
+    learner = Agent(prioritized = prioritized, seed = seed) # owns the trainer and the replay memory
+    shared_model = Linear_QNet(11, HIDDEN_SIZE, 3) # weights the actors copy from
+    shared_model.load_state_dict(learner.model.state_dict())
+    shared_model.share_memory() # tensors live in shared memory, no pickling per sync
+    version = ctx.Value('i', 0) # bumped every time new weights are published
+    lock = ctx.Lock() # actors never read half-written weights
+    transitions = ctx.Queue(maxsize = 4 * n_actors) # bounded so actors cannot run far ahead of the learner
+    scores = ctx.Queue()
+    stop = ctx.Event()
+
+    actors = [ctx.Process(target = actor, args = (i, shared_model, version, lock, transitions, scores, stop, sync_interval, seed + i + 1), daemon = True) for i in range(n_actors)]
+    for p in actors:
+        p.start()
+
+    metrics = MetricsLogger(metrics_path) # written off the learner loop
+    record = 0 # record score
+    updates = 0 # long memory updates done
+    try:
+        while max_games is None or learner.n_games < max_games:
+            try:
+                chunk = transitions.get(timeout = 1.0)
+            except queue.Empty: # nothing sent for a while, make sure the actors are still playing
+                failed = [(i, p.exitcode) for i, p in enumerate(actors) if p.exitcode not in (None, 0)]
+                if failed or not any(p.is_alive() for p in actors): # actors only stop once stop is set, so any exit here is a crash
+                    raise RuntimeError('actor processes exited: %s' % ', '.join('actor %d (exit code %s)' % (i, p.exitcode) for i, p in enumerate(actors) if not p.is_alive()))
+                continue
+            for transition in zip(*chunk): # remember
+                learner.remember(*transition)
+            learner.train_long_memory() # one batch update per received chunk
+            updates += 1
+
+            if updates % publish_interval == 0: # publish new weights for the actors
+                with lock:
+                    shared_model.load_state_dict(learner.model.state_dict())
+                    version.value += 1
+
+            while True: # report finished games
+                try:
+                    actor_id, score = scores.get_nowait()
+                except queue.Empty:
+                    break
+                learner.n_games += 1 # increment number of games
+                if score > record: # if score is greater than record
+                    record = score # record is score
+                    learner.model.save() # save model
+                print('Game:', learner.n_games, 'Actor:', actor_id, 'Score:', score, 'Record:', record) # print game, score, and record
+                metrics.log(score, record, actor = actor_id) # queued for the background writer
+    finally:
+        metrics.close() # write what is still queued
+        stop.set()
+        for p in actors:
+            p.join(timeout = 5)
+            if p.is_alive():
+                p.terminate()
+    return record
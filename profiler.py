@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import signal
+import cProfile
+import resource
+import threading
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# opt-in instrumentation for the training loop: wall time per phase, steps/s, games/min, replay size, loss and memory
+# summaries go to pluggable sinks (stdout, a JSONL file, a Prometheus text endpoint)
+# kill -USR1 <pid> records a cProfile window of the running loop into profile_<time>.prof (open with snakeviz or pstats)
+# the phases are ordinary function calls, so py-spy (py-spy top --pid <pid>) shows the same breakdown without any of this
+
+class _Phase: # times one `with profiler.phase(name):` block
+    __slots__ = ('totals', 'name', 'start')
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        entry = self.totals[self.name]
+        entry[0] += time.perf_counter() - self.start
+        entry[1] += 1
+
+class Profiler:
+    def __init__(self, sinks = (), interval = 30.0, profile_window = 10.0): # sinks = where summaries go, interval = seconds between summaries, profile_window = seconds per signal-triggered cProfile
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.profile_window = profile_window
+        self.totals = {} # phase -> [seconds, calls] since the start
+        self.phases = {} # phase -> reusable timer
+        self.gauges = {} # latest values, e.g. replay size and loss
+        self.steps = 0 # environment steps since the start
+        self.games = 0 # games since the start
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.last_steps = 0
+        self.last_games = 0
+        self.last_totals = {}
+        self.profile = None # running cProfile.Profile, if any
+        self.profile_until = 0.0
+        self.profile_requested = False
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, self._request_profile) # kill -USR1 <pid>
+
+    def phase(self, name): # context manager adding the block's wall time to `name`
+        timer = self.phases.get(name)
+        if timer is None:
+            self.totals[name] = [0.0, 0]
+            timer = self.phases[name] = _Phase(self.totals, name)
+        return timer
+
+    def gauge(self, name, value): # latest value of something, read when the next summary is built
+        self.gauges[name] = value
+
+    def step(self): # one environment step done | also where summaries and profile windows are driven from
+        self.steps += 1
+        if self.steps & 255 == 0: # look at the clock only every 256 steps
+            now = time.perf_counter()
+            if self.profile_requested or self.profile is not None:
+                self._profile_tick(now)
+            if now - self.last_report >= self.interval:
+                self.report(now)
+
+    def game(self): # one game finished
+        self.games += 1
+
+    def summary(self, now = None): # dict of everything measured, totals since the start plus rates since the last summary
+        now = time.perf_counter() if now is None else now
+        elapsed = now - self.last_report
+        phases = {}
+        for name, (seconds, calls) in self.totals.items():
+            last_seconds, last_calls = self.last_totals.get(name, (0.0, 0))
+            phases[name] = {
+                'total_s': seconds, 'calls': calls,
+                'window_s': seconds - last_seconds, # time spent in this phase since the last summary
+                'window_share': (seconds - last_seconds) / elapsed if elapsed > 0 else 0.0, # fraction of wall time
+                'mean_us': (seconds - last_seconds) / (calls - last_calls) * 1e6 if calls > last_calls else 0.0,
+            }
+        gauges = {k: float(v) for k, v in self.gauges.items()} # loss arrives as a tensor, converted only here
+        return {
+            'time': time.time(),
+            'uptime_s': now - self.start,
+            'steps': self.steps,
+            'games': self.games,
+            'steps_per_s': (self.steps - self.last_steps) / elapsed if elapsed > 0 else 0.0,
+            'games_per_min': (self.games - self.last_games) / elapsed * 60 if elapsed > 0 else 0.0,
+            'rss_mb': rss_mb(),
+            'phases': phases,
+            'gauges': gauges,
+        }
+
+    def report(self, now = None): # build a summary, hand it to every sink and start a new window
+        now = time.perf_counter() if now is None else now
+        summary = self.summary(now)
+        for sink in self.sinks:
+            sink.write(summary)
+        self.last_report = now
+        self.last_steps = self.steps
+        self.last_games = self.games
+        self.last_totals = {name: tuple(entry) for name, entry in self.totals.items()}
+        return summary
+
+    def _request_profile(self, signum, frame): # signal handler: only sets a flag, the loop starts the profile
+        self.profile_requested = True
+
+    def _profile_tick(self, now):
+        if self.profile is None: # start a window
+            self.profile_requested = False
+            self.profile = cProfile.Profile()
+            self.profile_until = now + self.profile_window
+            self.profile.enable()
+        elif now >= self.profile_until: # window over: dump it
+            self.profile.disable()
+            file_name = 'profile_%s.prof' % time.strftime('%Y%m%d_%H%M%S')
+            self.profile.dump_stats(file_name)
+            self.profile = None
+            print('Profile written to', file_name)
+
+    def close(self): # final summary and shut the sinks down
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile = None
+        self.report()
+        for sink in self.sinks:
+            sink.close()
+
+class NullProfiler: # what train() uses when instrumentation is off | every hook is a cheap no-op
+    def phase(self, name):
+        return _NULL
+
+    def gauge(self, name, value):
+        pass
+
+    def step(self):
+        pass
+
+    def game(self):
+        pass
+
+    def close(self):
+        pass
+
+_NULL = nullcontext()
+
+def rss_mb(): # resident memory of this process in MB
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # peak, not current, where /proc is missing
+
+class PrintSink: # one compact line per summary
+    def write(self, summary):
+        phases = sorted(summary['phases'].items(), key = lambda item: -item[1]['window_share'])
+        breakdown = ', '.join('%s %.0f%%' % (name, p['window_share'] * 100) for name, p in phases)
+        gauges = ', '.join('%s %.4g' % item for item in summary['gauges'].items())
+        print('[profile] %.0f steps/s, %.1f games/min, %.0f MB | %s | %s' % (summary['steps_per_s'], summary['games_per_min'], summary['rss_mb'], breakdown, gauges))
+
+    def close(self):
+        pass
+
+class FileSink: # one JSON line per summary
+    def __init__(self, path = 'profile.jsonl'):
+        self.file = open(path, 'a')
+
+    def write(self, summary):
+        self.file.write(json.dumps(summary) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class PrometheusSink: # latest summary served as Prometheus text on http://host:port/metrics
+    def __init__(self, port = 9100, host = '127.0.0.1'):
+        self.text = '' # latest exposition, swapped in whole so readers never see half of it
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = sink.text.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): # keep the training output clean
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+
+    def write(self, summary):
+        lines = [
+            'snake_steps_total %d' % summary['steps'],
+            'snake_games_total %d' % summary['games'],
+            'snake_steps_per_second %f' % summary['steps_per_s'],
+            'snake_games_per_minute %f' % summary['games_per_min'],
+            'snake_rss_megabytes %f' % summary['rss_mb'],
+        ]
+        for name, p in summary['phases'].items():
+            lines.append('snake_phase_seconds_total{phase="%s"} %f' % (name, p['total_s']))
+            lines.append('snake_phase_calls_total{phase="%s"} %d' % (name, p['calls']))
+        for name, value in summary['gauges'].items():
+            lines.append('snake_%s %f' % (name, value))
+        self.text = '\n'.join(lines) + '\n'
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,50 @@
+import os
+import pygame
+from SnakeGameAI import BLOCK_SIZE # size of each block
+
+SPEED = 50 # speed of the game
+
+# RGB colors
+WHITE = (255, 255, 255)
+RED1 = (255, 0, 0)
+RED2 = (200, 0, 0)
+BLUE1 = (0, 0, 255)
+BLUE2 = (0, 100, 255)
+BLACK = (0, 0, 0)
+GREEN1 = (0, 255, 0)
+GREEN2 = (0, 200, 0)
+GREY = (128, 128, 128)
+
+class Renderer: # opt-in pygame window for watching a SnakeGameAI run
+    def __init__(self, w = 640, h = 480, speed = SPEED): # w = width, h = height, speed = frames per second
+        pygame.init() # initialize all imported pygame modules
+        # self.font = pygame.font.Font('ChrustyRock-ORLA.ttf', 25)   # issue with this font for numbers 3-9
+        self.font = pygame.font.Font(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'arial_bold.ttf'), 25) # font | next to this file, so replays work from any folder
+        self.speed = speed # frame-rate cap
+        self.display = pygame.display.set_mode((w, h)) # set display
+        pygame.display.set_caption('Snake Game') # set caption
+        self.clock = pygame.time.Clock() # create an object to help track time
+
+    def handle_events(self): # collect user input
+        for event in pygame.event.get(): # for each event
+            if event.type == pygame.QUIT: # if event is quit
+                pygame.quit()
+                quit()
+
+    def draw(self, game): # update ui and tick the clock
+        self.update_ui(game) # update ui
+        self.clock.tick(self.speed) # tick the clock
+
+    def update_ui(self, game):
+        self.display.fill(BLACK) # fill display with black
+
+        for pt in game.snake:
+            pygame.draw.rect(self.display, GREEN1, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)) # draw a rectangle for Green1
+            pygame.draw.rect(self.display, GREEN2, pygame.Rect(pt.x + 4, pt.y + 4, 12, 12)) # draw a rectangle for Green2
+
+        pygame.draw.rect(self.display, RED1, pygame.Rect(game.food.x, game.food.y, BLOCK_SIZE, BLOCK_SIZE)) # draw a rectangle for Red1
+        pygame.draw.rect(self.display, RED2, pygame.Rect(game.food.x + 4, game.food.y + 4, 12, 12)) # draw a rectangle for food for Red2
+
+        text = self.font.render('Score: ' + str(game.score), True, WHITE) # render text
+        self.display.blit(text, [0, 0]) # blit draws one image onto another | blit(source, dest, area = None, special_flags = 0) -> Rect
+        pygame.display.flip()
@@ -0,0 +1,240 @@
+import os
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+
+class ReplayBuffer: # fixed-size replay memory stored in contiguous arrays | replaces a deque of tuples
+    def __init__(self, capacity, state_size = 11, action_size = 3, seed = None, packed = False): # capacity = most transitions kept, oldest overwritten first | state_size = features per state, or a shape such as GridEncoder.shape
+        # packed = store the states bit-packed, 8 times smaller | only for states that are all 0 or 1, such as GridEncoder board planes
+        self.capacity = capacity # number of samples to store in memory
+        shape = state_size if isinstance(state_size, tuple) else (state_size,)
+        self.shape = shape # one state
+        self.packed = packed
+        self.state_bits = int(np.prod(shape)) # values per state
+        row = ((self.state_bits + 7) // 8,) if packed else shape # stored bytes per state
+        self.states = np.zeros((capacity, *row), dtype = np.uint8) # the 11 state features are 0 or 1, board planes and ray distances fit in uint8 too
+        self.actions = np.zeros((capacity, action_size), dtype = np.uint8) # one-hot [straight, right, left]
+        self.rewards = np.zeros(capacity, dtype = np.float32) # reward
+        self.next_states = np.zeros((capacity, *row), dtype = np.uint8) # state after the move
+        self.dones = np.zeros(capacity, dtype = bool) # game over after the move
+        self.pos = 0 # next row to write
+        self.size = 0 # rows filled so far
+        self.rng = np.random.default_rng(seed) # random generator for sampling
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done): # store one transition, overwriting the oldest when full
+        i = self.pos
+        if self.packed:
+            state = np.packbits(state, axis = None) # flattened, 8 values per byte
+            next_state = np.packbits(next_state, axis = None)
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return i # row the transition was written to
+
+    def sample(self, batch_size): # random batch as tensors ready for QTrainer.train_step | whole memory if it holds batch_size or fewer
+        if self.size > batch_size:
+            idx = self.rng.integers(0, self.size, size = batch_size) # uniform random rows
+        else:
+            idx = np.arange(self.size) # everything we have
+        return self.batch(idx)
+
+    def state_dict(self): # filled rows and ring position as numpy arrays, for checkpoints
+        return {
+            'states': self.states[:self.size], 'actions': self.actions[:self.size], 'rewards': self.rewards[:self.size],
+            'next_states': self.next_states[:self.size], 'dones': self.dones[:self.size],
+            'pos': np.array(self.pos), 'size': np.array(self.size),
+        }
+
+    def load_state_dict(self, state): # restore rows saved by state_dict() | must fit in this buffer's capacity
+        size = int(state['size'])
+        self.states[:size] = state['states']
+        self.actions[:size] = state['actions']
+        self.rewards[:size] = state['rewards']
+        self.next_states[:size] = state['next_states']
+        self.dones[:size] = state['dones']
+        self.pos = int(state['pos'])
+        self.size = size
+
+    def _unpack(self, rows): # stored rows back to (N, *shape) states
+        if not self.packed:
+            return rows
+        return np.unpackbits(rows, axis = 1, count = self.state_bits).reshape(len(rows), *self.shape)
+
+    def batch(self, idx): # (state, action, reward, next_state, done) tensors for rows idx
+        return (
+            torch.from_numpy(self._unpack(self.states[idx])).float(),
+            torch.from_numpy(self.actions[idx]).long(),
+            torch.from_numpy(self.rewards[idx]),
+            torch.from_numpy(self._unpack(self.next_states[idx])).float(),
+            torch.from_numpy(self.dones[idx]),
+        )
+
+class SumTree: # binary tree in one array where every node holds the sum of its children | O(log n) priority updates and proportional sampling
+    def __init__(self, capacity):
+        self.leaves = 1 << max(capacity - 1, 1).bit_length() # leaf count rounded up to a power of two, leaf i lives at node leaves + i
+        self.depth = self.leaves.bit_length() - 1 # levels below the root
+        self.nodes = np.zeros(2 * self.leaves, dtype = np.float64) # node 1 is the root, children of node k are 2k and 2k + 1
+
+    def total(self): # sum of all priorities
+        return self.nodes[1]
+
+    def get(self, idx): # priorities of data rows idx
+        return self.nodes[self.leaves + idx]
+
+    def update(self, idx, priorities): # set the priorities of data rows idx and fix the sums above them, one tree level at a time for the whole batch
+        node = self.leaves + np.asarray(idx)
+        self.nodes[node] = priorities
+        node = np.unique(node // 2)
+        while node[0] >= 1: # stops once the root (node 1) has been summed and the parents become node 0
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+            node = np.unique(node // 2)
+
+    def set(self, i, priority): # single-row update without the numpy overhead of update()
+        node = self.leaves + i
+        self.nodes[node] = priority
+        node //= 2
+        while node >= 1:
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+            node //= 2
+
+    def find(self, values): # data rows whose cumulative priority range contains each value in [0, total)
+        node = np.ones(len(values), dtype = np.int64) # start every search at the root
+        values = np.array(values, dtype = np.float64)
+        for _ in range(self.depth):
+            left = 2 * node
+            left_sum = self.nodes[left]
+            go_right = values >= left_sum
+            values -= left_sum * go_right # skip the left subtree's share
+            node = left + go_right
+        return node - self.leaves
+
+class PrioritizedReplayBuffer(ReplayBuffer): # replay memory that samples transitions in proportion to their last TD error
+    def __init__(self, capacity, state_size = 11, action_size = 3, alpha = 0.6, beta = 0.4, beta_increment = 1e-4, eps = 1e-3, seed = None, packed = False):
+        super().__init__(capacity, state_size, action_size, seed, packed) # same arrays as the uniform buffer
+        self.alpha = alpha # how strongly priorities skew sampling | 0 = uniform
+        self.beta = beta # importance-sampling correction | annealed towards 1 (full correction)
+        self.beta_increment = beta_increment # beta increase per sampled batch
+        self.eps = eps # keeps zero-error transitions sampleable
+        self.max_priority = 1.0 # new transitions get the highest priority seen so they are replayed at least once
+        self.tree = SumTree(capacity)
+
+    def push(self, state, action, reward, next_state, done):
+        i = super().push(state, action, reward, next_state, done)
+        self.tree.set(i, self.max_priority)
+        return i
+
+    def sample(self, batch_size): # (state, action, reward, next_state, done, idx, weights) | idx goes back to update_priorities
+        n = min(batch_size, self.size)
+        total = self.tree.total()
+        segment = total / n # one draw from each equal slice of the total priority (stratified sampling)
+        values = (np.arange(n) + self.rng.random(n)) * segment
+        idx = np.minimum(self.tree.find(values), self.size - 1) # guard against float rounding landing past the filled rows
+
+        probs = self.tree.get(idx) / total # sampling probability of each row
+        weights = (self.size * probs) ** -self.beta # importance-sampling weights undo the bias of non-uniform sampling
+        weights /= weights.max() # only ever scale the update down
+        self.beta = min(1.0, self.beta + self.beta_increment)
+
+        return self.batch(idx) + (idx, torch.from_numpy(weights.astype(np.float32)))
+
+    def state_dict(self):
+        state = super().state_dict()
+        state['tree'] = self.tree.nodes
+        state['beta'] = np.array(self.beta)
+        state['max_priority'] = np.array(self.max_priority)
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        if 'tree' in state: # a uniform buffer's snapshot has no priorities, every row then starts at max priority
+            self.tree.nodes[:] = state['tree']
+            self.beta = float(state['beta'])
+            self.max_priority = float(state['max_priority'])
+        else:
+            self.tree.update(np.arange(self.size), self.max_priority)
+
+    def update_priorities(self, idx, td_errors): # new priorities from the absolute TD errors of the last train_step
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+# one transition per fixed-size record on disk | the 11 binary state features are bit-packed into 2 bytes
+RECORD = np.dtype([
+    ('state', np.uint8, (2,)), # np.packbits of the 11 state features
+    ('action', np.uint8), # move index 0 = straight, 1 = right, 2 = left
+    ('reward', np.int8), # rewards are -10, 0 or 10
+    ('next_state', np.uint8, (2,)), # np.packbits of the next state
+    ('done', bool), # game over after the move
+]) # 7 bytes per transition
+
+class ReplayStore: # append-only transition file read through np.memmap | grows past RAM and survives between runs
+    def __init__(self, path, state_size = 11, action_size = 3, seed = None): # path = record file, created if missing
+        self.path = path
+        self.state_size = state_size
+        self.action_size = action_size
+        self.rng = np.random.default_rng(seed) # random generator for sampling
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        self.file = open(path, 'ab') # appends only ever add whole records
+        self.size = os.path.getsize(path) // RECORD.itemsize # records already stored
+        if os.path.getsize(path) != self.size * RECORD.itemsize: # a crash mid-write left part of a record, which would shift every later record
+            print('ReplayStore: dropping a partial record at the end of', path)
+            self.file.truncate(self.size * RECORD.itemsize)
+        self.map = None # read-only memmap, reopened when it falls behind the file
+
+    def __len__(self):
+        return self.size
+
+    def append(self, states, actions, rewards, next_states, dones): # store a batch of transitions, e.g. one finished game
+        states = np.asarray(states, dtype = np.uint8)
+        records = np.empty(len(states), dtype = RECORD)
+        records['state'] = np.packbits(states, axis = 1)
+        records['action'] = np.asarray(actions).argmax(axis = 1)
+        records['reward'] = rewards
+        records['next_state'] = np.packbits(np.asarray(next_states, dtype = np.uint8), axis = 1)
+        records['done'] = dones
+        self.file.write(records.tobytes())
+        self.size += len(records)
+
+    def truncate(self, size): # keep only the first size records | drops transitions a crashed run appended past its checkpoint
+        if size < self.size:
+            self.file.flush()
+            self.file.truncate(size * RECORD.itemsize)
+            self.size = size
+            self.map = None # may map records that are gone
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.map = None
+
+    def _records(self): # memmap over every record written so far
+        if self.map is None or len(self.map) < self.size:
+            self.file.flush() # make our own appends visible to the map
+            self.map = np.memmap(self.path, dtype = RECORD, mode = 'r', shape = (self.size,))
+        return self.map
+
+    def sample(self, batch_size): # random batch as tensors ready for QTrainer.train_step
+        idx = np.sort(self.rng.integers(0, self.size, size = batch_size)) # sorted rows read the file front to back
+        return self.batch(idx)
+
+    def batch(self, idx): # (state, action, reward, next_state, done) tensors for rows idx | only these rows are read from disk
+        records = self._records()[idx]
+        actions = np.zeros((len(idx), self.action_size), dtype = np.uint8)
+        actions[np.arange(len(idx)), records['action']] = 1 # back to one-hot
+        return (
+            torch.from_numpy(np.unpackbits(records['state'], axis = 1, count = self.state_size)).float(),
+            torch.from_numpy(actions).long(),
+            torch.from_numpy(records['reward'].astype(np.float32)),
+            torch.from_numpy(np.unpackbits(records['next_state'], axis = 1, count = self.state_size)).float(),
+            torch.from_numpy(records['done']),
+        )
@@ -0,0 +1,206 @@
+import numpy as np # numpy is a library for scientific computing
+import torch # pytorch
+from SnakeGameAI import Direction, Point, BLOCK_SIZE # Direction is an enum, Point is a namedtuple, BLOCK_SIZE is a constant
+from VecSnakeEnv import DX, DY # x and y step for each clockwise direction index
+
+# the 11 state features for many games at once, written into preallocated buffers
+# [danger straight, danger right, danger left, dir left, dir right, dir up, dir down, food left, food right, food up, food down]
+STATE_SIZE = 11
+
+CLOCK_WISE = {Direction.RIGHT: 0, Direction.DOWN: 1, Direction.LEFT: 2, Direction.UP: 3} # same order as SnakeGameAI._move
+DIRECTION_FEATURES = np.array([ # clockwise index -> [dir left, dir right, dir up, dir down]
+    [0, 1, 0, 0], # RIGHT
+    [0, 0, 0, 1], # DOWN
+    [1, 0, 0, 0], # LEFT
+    [0, 0, 1, 0], # UP
+], dtype = np.uint8)
+LOOK = np.array([0, 1, -1]) # [straight, right, left] -> change in clockwise index
+DIRECTION_ROWS = [tuple(row) for row in DIRECTION_FEATURES.tolist()] # plain tuples for the per-game path
+LOOK_STEPS = [[(int(DX[(d + t) % 4]) * BLOCK_SIZE, int(DY[(d + t) % 4]) * BLOCK_SIZE) for t in LOOK] for d in range(4)] # clockwise index -> pixel offsets of the straight, right and left cells
+
+class _Encoder: # preallocated uint8 states and float32 model input of one observation shape
+    def __init__(self, shape, n_games = 1): # shape = one state, n_games = most games encoded in one call
+        self.shape = shape
+        self.states = np.zeros((n_games, *shape), dtype = np.uint8) # encoded states
+        self.inputs = np.zeros((n_games, *shape), dtype = np.float32) # model input
+        self.inputs_tensor = torch.from_numpy(self.inputs) # shares memory with self.inputs, no copy per step
+
+    def to_tensor(self, states): # float32 model input for states | a view of a preallocated buffer, overwritten by the next call
+        states = np.asarray(states)
+        if states.shape == self.shape: # single state
+            np.copyto(self.inputs[0], states)
+            return self.inputs_tensor[0]
+        n = len(states)
+        np.copyto(self.inputs[:n], states)
+        return self.inputs_tensor[:n]
+
+class StateEncoder(_Encoder):
+    def __init__(self, n_games = 1): # n_games = most games encoded in one call
+        super().__init__((STATE_SIZE,), n_games) # 0/1 features
+
+    def encode(self, head_x, head_y, direction, food_x, food_y, danger): # arrays of length N | direction = clockwise index, danger = (N, 3) [straight, right, left]
+        n = len(head_x)
+        states = self.states[:n]
+        states[:, 0:3] = danger
+        states[:, 3:7] = DIRECTION_FEATURES[direction]
+        states[:, 7] = food_x < head_x # food left
+        states[:, 8] = food_x > head_x # food right
+        states[:, 9] = food_y < head_y # food up
+        states[:, 10] = food_y > head_y # food down
+        return states
+
+    def encode_games(self, games): # states for a list of SnakeGameAI games | three collision lookups per game instead of up to twelve
+        states = self.states[:len(games)]
+        for i, game in enumerate(games): # plain Python per game, numpy's per-call overhead would dominate for a handful of games
+            head = game.snake[0] # head of snake
+            food = game.food
+            steps = LOOK_STEPS[CLOCK_WISE[game.direction]] # pixel offsets of the straight, right and left cells
+            states[i] = (
+                game.is_collision(Point(head.x + steps[0][0], head.y + steps[0][1])), # danger straight
+                game.is_collision(Point(head.x + steps[1][0], head.y + steps[1][1])), # danger right
+                game.is_collision(Point(head.x + steps[2][0], head.y + steps[2][1])), # danger left
+                *DIRECTION_ROWS[CLOCK_WISE[game.direction]], # move direction
+                food.x < head.x, # food left
+                food.x > head.x, # food right
+                food.y < head.y, # food up
+                food.y > head.y, # food down
+            )
+        return states
+
+    def encode_vec(self, env): # states for every game of a VecSnakeEnv, fully vectorized over its arrays
+        look = (env.direction[:, None] + LOOK) % 4 # (N, 3) direction of the straight, right and left cells
+        x = env.head_x[:, None] + DX[look]
+        y = env.head_y[:, None] + DY[look]
+        out = (x < 0) | (x >= env.cols) | (y < 0) | (y >= env.rows) # hits boundary
+        cell = np.clip(y, 0, env.rows - 1) * env.cols + np.clip(x, 0, env.cols - 1)
+        danger = out | env.occupied[env._arange[:, None], cell] # hits itself
+        return self.encode(env.head_x, env.head_y, env.direction, env.food % env.cols, env.food // env.cols, danger)
+
+# full board as uint8 planes (channels, rows, cols) | the conv network in model.py reads it
+# [body (head included), head, neck (body part behind the head, gives the direction), food]
+GRID_CHANNELS = 4
+
+class GridEncoder(_Encoder):
+    def __init__(self, cols, rows, n_games = 1): # cols, rows = board size in cells
+        super().__init__((GRID_CHANNELS, rows, cols), n_games)
+        self.cols = cols
+        self.rows = rows
+        self.n_cells = cols * rows
+
+    def encode_games(self, games): # states for a list of SnakeGameAI games | planes copied from the occupancy grids
+        states = self.states[:len(games)]
+        states.fill(0)
+        planes = states.reshape(len(games), GRID_CHANNELS, self.n_cells) # flat cells, same indexes as SnakeGameAI._cell
+        for i, game in enumerate(games):
+            np.minimum(np.frombuffer(game.occupied, dtype = np.uint8), 1, out = planes[i, 0]) # counts are 2 where the head ran into the body
+            for channel, pt in ((1, game.snake[0]), (2, game.snake[1]), (3, game.food)):
+                if 0 <= pt.x < game.w and 0 <= pt.y < game.h: # the head is off the board after hitting a wall
+                    planes[i, channel, game._cell(pt)] = 1
+        return states
+
+    def encode_vec(self, env): # states for every game of a VecSnakeEnv, fully vectorized over its arrays
+        states = self.states[:env.n]
+        planes = states.reshape(env.n, GRID_CHANNELS, self.n_cells)
+        planes[:, 0] = env.occupied
+        planes[:, 1:].fill(0)
+        planes[env._arange, 1, env.heads()] = 1
+        planes[env._arange, 2, env.body[env._arange, (env.tail + env.length - 2) % env.n_cells]] = 1 # neck
+        planes[env._arange, 3, env.food] = 1
+        return states
+
+# 8 rays from the head, turned with the snake: straight, front right, right, back right, back, back left, left, front left
+# each ray gives [cells to the wall, cells to the first body part (0 = none), cells to the food (0 = not on this ray)]
+# followed by [food ahead, food behind, food right, food left] relative to the move direction
+RAY_DX = np.array([1, 1, 0, -1, -1, -1, 0, 1], dtype = np.int32) # x step of the 8 directions, clockwise from RIGHT
+RAY_DY = np.array([0, 1, 1, 1, 0, -1, -1, -1], dtype = np.int32) # y step of the 8 directions, clockwise from RIGHT
+N_RAYS = 8
+RAY_INDEX = {(int(dx), int(dy)): ray for ray, (dx, dy) in enumerate(zip(RAY_DX, RAY_DY))} # (x step, y step) -> 8-direction index
+STEPS = [(int(DX[d]), int(DY[d])) for d in range(4)] # clockwise index -> plain int (x step, y step) for the per-game path
+RAY_SIZE = N_RAYS * 3 + 4
+
+class RayEncoder(_Encoder):
+    def __init__(self, cols, rows, n_games = 1): # cols, rows = board size in cells
+        super().__init__((RAY_SIZE,), n_games)
+        self.cols = cols
+        self.rows = rows
+        self.steps = np.arange(1, max(cols, rows) + 1, dtype = np.int32) # cells along a ray
+        self.scale = np.ones(RAY_SIZE, dtype = np.float32) # model input scale, see model.Ray_QNet
+        self.scale[:N_RAYS * 3] = 1 / len(self.steps) # distances -> 0..1
+        self.ray_cells = [[[] for _ in range(N_RAYS)] for _ in range(cols * rows)] # cell -> ray -> cells on the board along it, nearest first
+        for y in range(rows):
+            for x in range(cols):
+                for ray in range(N_RAYS):
+                    cx, cy = x + RAY_DX[ray], y + RAY_DY[ray]
+                    while 0 <= cx < cols and 0 <= cy < rows:
+                        self.ray_cells[y * cols + x][ray].append(int(cy * cols + cx))
+                        cx, cy = cx + RAY_DX[ray], cy + RAY_DY[ray]
+
+    def encode(self, occupied, head_x, head_y, direction, food_x, food_y): # occupied = (N, cells) grids, the rest arrays of length N in cells
+        n = len(head_x)
+        states = self.states[:n]
+        rays = states[:, :N_RAYS * 3].reshape(n, N_RAYS, 3)
+        ray = (2 * direction[:, None] + np.arange(N_RAYS)) % N_RAYS # (N, 8) absolute direction of each ray | clockwise index d is 8-direction 2d
+        dx = RAY_DX[ray]
+        dy = RAY_DY[ray]
+        x = head_x[:, None, None] + dx[:, :, None] * self.steps # (N, 8, steps) cells along every ray
+        y = head_y[:, None, None] + dy[:, :, None] * self.steps
+        inside = (x >= 0) & (x < self.cols) & (y >= 0) & (y < self.rows)
+        rays[:, :, 0] = inside.sum(axis = 2) + 1 # the cells on the board come first, the wall is one past them
+        cell = np.clip(y, 0, self.rows - 1) * self.cols + np.clip(x, 0, self.cols - 1)
+        body = occupied[np.arange(n)[:, None, None], cell].astype(bool) & inside
+        rays[:, :, 1] = np.where(body.any(axis = 2), body.argmax(axis = 2) + 1, 0) # first body part
+        fx = (food_x - head_x)[:, None]
+        fy = (food_y - head_y)[:, None]
+        dist = np.maximum(np.abs(fx), np.abs(fy)) # steps along a ray that could reach the food
+        rays[:, :, 2] = np.where((dx * dist == fx) & (dy * dist == fy) & (dist > 0), dist, 0)
+        ahead = fx[:, 0] * DX[direction] + fy[:, 0] * DY[direction] # food position in the snake's frame
+        right = fx[:, 0] * DX[(direction + 1) % 4] + fy[:, 0] * DY[(direction + 1) % 4]
+        states[:, -4] = ahead > 0 # food ahead
+        states[:, -3] = ahead < 0 # food behind
+        states[:, -2] = right > 0 # food right
+        states[:, -1] = right < 0 # food left
+        return states
+
+    def encode_games(self, games): # states for a list of SnakeGameAI games | plain Python walks along precomputed ray cells, stopping at the first body part
+        states = self.states[:len(games)]
+        for i, game in enumerate(games):
+            head = game.snake[0]
+            d = CLOCK_WISE[game.direction]
+            hx = int(head.x) // BLOCK_SIZE
+            hy = int(head.y) // BLOCK_SIZE
+            fx = int(game.food.x) // BLOCK_SIZE - hx
+            fy = int(game.food.y) // BLOCK_SIZE - hy
+            row = [0] * RAY_SIZE
+            if 0 <= hx < self.cols and 0 <= hy < self.rows: # after hitting a wall the head is off the board and the rays stay 0
+                occupied = game.occupied
+                rays = self.ray_cells[hy * self.cols + hx]
+                for k in range(N_RAYS):
+                    cells = rays[(2 * d + k) % N_RAYS]
+                    row[3 * k] = len(cells) + 1 # wall
+                    for step, cell in enumerate(cells, 1):
+                        if occupied[cell]: # first body part
+                            row[3 * k + 1] = step
+                            break
+            dist = max(abs(fx), abs(fy))
+            if dist and (fx == 0 or fy == 0 or abs(fx) == abs(fy)): # food on one of the rays
+                ray = RAY_INDEX[(fx > 0) - (fx < 0), (fy > 0) - (fy < 0)]
+                row[3 * ((ray - 2 * d) % N_RAYS) + 2] = dist
+            ahead = fx * STEPS[d][0] + fy * STEPS[d][1] # food position in the snake's frame
+            right = fx * STEPS[(d + 1) % 4][0] + fy * STEPS[(d + 1) % 4][1]
+            row[-4:] = ahead > 0, ahead < 0, right > 0, right < 0 # food ahead, behind, right, left
+            states[i] = row
+        return states
+
+    def encode_vec(self, env): # states for every game of a VecSnakeEnv
+        return self.encode(env.occupied, env.head_x, env.head_y, env.direction, env.food % env.cols, env.food // env.cols)
+
+OBSERVATIONS = ('features', 'grid', 'rays') # what Agent can see
+
+def make_encoder(observation, cols, rows, n_games = 1): # encoder for one of OBSERVATIONS on a cols x rows board
+    if observation == 'features':
+        return StateEncoder(n_games)
+    if observation == 'grid':
+        return GridEncoder(cols, rows, n_games)
+    if observation == 'rays':
+        return RayEncoder(cols, rows, n_games)
+    raise ValueError('unknown observation %r, expected one of %s' % (observation, ', '.join(OBSERVATIONS)))
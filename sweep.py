@@ -0,0 +1,115 @@
+import os
+import json
+import math
+import random
+import shutil
+import argparse # command line options
+import itertools
+import contextlib
+import numpy as np # numpy is a library for scientific computing
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# hyperparameter sweep: many headless train() runs in a process pool with successive halving
+# every configuration plays a first rung of games, the best 1/eta continue to eta times as many games (resuming from their checkpoint), and so on
+# run with: python sweep.py --lr 0.001 0.0005 --batch-size 500 1000 --hidden-size 128 256 --workers 8
+
+def run_trial(trial_dir, config, seed, games, resume): # one rung of one configuration, in a pool worker | returns its scores after `games` games
+    import torch # pytorch
+    from agent import train # train is the training loop
+    torch.set_num_threads(1) # the pool already uses every core
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    os.makedirs(trial_dir, exist_ok = True)
+    os.chdir(trial_dir) # Linear_QNet.save writes to ./model, keep each trial's files apart
+    with open('train.log', 'a') as log, contextlib.redirect_stdout(log): # train prints a line per game
+        record = train(max_games = games, resume = resume, checkpoint_interval = games, seed = seed, **config)
+
+    last = None
+    with open('metrics.jsonl') as f:
+        for line in f:
+            last = line
+    last = json.loads(last)
+    return {'games': last['game'], 'rolling_mean': last['rolling_mean'], 'mean_score': last['mean_score'], 'record': record}
+
+def grid(options): # every combination of the given hyperparameter values
+    keys = [k for k, values in options.items() if values]
+    return [dict(zip(keys, values)) for values in itertools.product(*(options[k] for k in keys))]
+
+def curve(trial_dir, max_points = 200): # (game, rolling mean) pairs for the report, decimated
+    with open(os.path.join(trial_dir, 'metrics.jsonl')) as f:
+        rows = [json.loads(line) for line in f]
+    step = max(1, len(rows) // max_points)
+    return [(row['game'], row['rolling_mean']) for row in rows[::step]]
+
+def sweep(configs, out_dir = 'sweep', min_games = 50, max_games = 800, eta = 3, workers = None, seed = 0): # successive halving over configs | returns the report dict
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok = True)
+    trials = [{'id': i, 'config': config, 'seed': seed + i, 'dir': os.path.join(out_dir, 'trial_%03d' % i), 'results': [], 'stopped_at': None} for i, config in enumerate(configs)]
+    alive = list(trials)
+    games = min_games
+    resume = False
+    ctx = mp.get_context('spawn') # fresh interpreters, safe with torch threads
+    with ProcessPoolExecutor(max_workers = workers, mp_context = ctx) as pool:
+        while True:
+            futures = {pool.submit(run_trial, t['dir'], t['config'], t['seed'], games, resume): t for t in alive}
+            for future in as_completed(futures):
+                trial = futures[future]
+                result = future.result()
+                trial['results'].append(result)
+                print('Trial', trial['id'], trial['config'], 'games:', result['games'], 'rolling mean:', round(result['rolling_mean'], 2), 'record:', result['record'])
+
+            if len(alive) == 1 or games >= max_games:
+                break
+            alive.sort(key = lambda t: t['results'][-1]['rolling_mean'], reverse = True)
+            keep = max(1, math.ceil(len(alive) / eta)) # best 1/eta go on
+            for trial in alive[keep:]:
+                trial['stopped_at'] = games # fell behind, stop here
+            alive = alive[:keep]
+            games = min(games * eta, max_games)
+            resume = True
+
+    best = max(alive, key = lambda t: t['results'][-1]['rolling_mean'])
+    best_model = os.path.join(out_dir, 'best_model.pth')
+    shutil.copyfile(os.path.join(best['dir'], 'model', 'checkpoint.pth'), os.path.join(out_dir, 'best_checkpoint.pth'))
+    if os.path.exists(os.path.join(best['dir'], 'model', 'model.pth')): # saved on its record score
+        shutil.copyfile(os.path.join(best['dir'], 'model', 'model.pth'), best_model)
+
+    report = {
+        'min_games': min_games, 'max_games': max_games, 'eta': eta, 'seed': seed,
+        'best': {'id': best['id'], 'config': best['config'], **best['results'][-1], 'model': best_model, 'checkpoint': os.path.join(out_dir, 'best_checkpoint.pth')},
+        'trials': [{
+            'id': t['id'], 'config': t['config'], 'seed': t['seed'], 'dir': t['dir'], 'stopped_at': t['stopped_at'],
+            'rungs': t['results'], 'curve': curve(t['dir']),
+        } for t in trials],
+    }
+    with open(os.path.join(out_dir, 'report.json'), 'w') as f:
+        json.dump(report, f, indent = 2)
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Hyperparameter sweep with successive halving')
+    parser.add_argument('--lr', type = float, nargs = '+', help = 'learning rates')
+    parser.add_argument('--batch-size', type = int, nargs = '+', help = 'long memory batch sizes')
+    parser.add_argument('--max-memory', type = int, nargs = '+', help = 'replay memory sizes')
+    parser.add_argument('--gamma', type = float, nargs = '+', help = 'discount rates')
+    parser.add_argument('--hidden-size', type = int, nargs = '+', help = 'hidden layer sizes')
+    parser.add_argument('--prioritized', type = int, nargs = '+', choices = [0, 1], help = 'prioritized replay off/on')
+    parser.add_argument('--min-games', type = int, default = 50, help = 'games in the first rung')
+    parser.add_argument('--max-games', type = int, default = 800, help = 'games for the configurations that survive to the end')
+    parser.add_argument('--eta', type = int, default = 3, help = 'keep the best 1/eta at each rung, the next rung plays eta times as many games')
+    parser.add_argument('--workers', type = int, default = None, help = 'processes in the pool (default: one per core)')
+    parser.add_argument('--seed', type = int, default = 0, help = 'trial i uses seed + i')
+    parser.add_argument('--out', default = 'sweep', help = 'folder for trial runs and report.json')
+    args = parser.parse_args()
+
+    configs = grid({
+        'lr': args.lr, 'batch_size': args.batch_size, 'max_memory': args.max_memory,
+        'gamma': args.gamma, 'hidden_size': args.hidden_size,
+        'prioritized': [bool(p) for p in args.prioritized] if args.prioritized else None,
+    })
+    print(len(configs), 'configurations')
+    report = sweep(configs, args.out, args.min_games, args.max_games, args.eta, args.workers, args.seed)
+    print('Best:', report['best']['config'], 'rolling mean:', round(report['best']['rolling_mean'], 2), '->', os.path.join(args.out, 'report.json'))